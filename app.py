@@ -5,14 +5,24 @@ This file creates the web interface using Streamlit. It handles user interaction
 data filtering, and displays all the charts and metrics.
 """
 
+import time
+
+# Start of this rerun, for the page render and paint timings
+rerun_started = time.perf_counter()
+
+# Only light modules are imported up front: pandas (through data_processor)
+# loads in a background thread while the header and filters are drawn, and
+# Plotly loads with the first chart, so a cold instance shows the page sooner.
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
-from data_processor import CrimeDataProcessor
-import sqlite3
+from filters import ALL_NEIGHBORHOODS, ALL_CRIME_TYPES
+import charts
+from charts import TORONTO_BLUE, TORONTO_LIGHT_BLUE, TORONTO_GRAY, TORONTO_LIGHT_GRAY
+import instrumentation
+import math
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 # Configure the web page
 st.set_page_config(
@@ -23,30 +33,48 @@ st.set_page_config(
 )
 
 # Initialize session state to remember user selections
-if 'neighborhood' not in st.session_state:
-    st.session_state.neighborhood = 'All Districts'
-if 'crime_type' not in st.session_state:
-    st.session_state.crime_type = 'All Types'
+# An empty neighborhood/crime type selection means "All"
+if 'neighborhoods' not in st.session_state:
+    st.session_state.neighborhoods = []
+if 'crime_types' not in st.session_state:
+    st.session_state.crime_types = []
 if 'date_range' not in st.session_state:
     st.session_state.date_range = '12months'
 if 'filters_applied' not in st.session_state:
     st.session_state.filters_applied = False
 
 # Set up database connection
+# Set TORONTO_CRIME_SHARDS to a directory built by scripts/shard_database.py
+# to read from per-year shard files instead of toronto_crime.db
+SHARD_DIR = os.environ.get('TORONTO_CRIME_SHARDS')
+# TORONTO_CRIME_DB points the dashboard at another single-file database
+DB_PATH = os.environ.get('TORONTO_CRIME_DB', 'toronto_crime.db')
+
+def load_data_processor():
+    """Import the data layer and open the database (runs in the background)"""
+    with instrumentation.timed('startup.processor'):
+        from data_processor import CrimeDataProcessor
+        processor = CrimeDataProcessor(shard_dir=SHARD_DIR) if SHARD_DIR else CrimeDataProcessor(DB_PATH)
+        # Opens the change-detection connection the first rerun needs anyway
+        processor.get_data_version()
+        return processor
+
 @st.cache_resource
-def init_data_processor():
-    if not os.path.exists('toronto_crime.db'):
+def start_data_processor():
+    """Start loading the processor in a background thread; returns its future"""
+    if SHARD_DIR:
+        if not os.path.exists(os.path.join(SHARD_DIR, 'catalog.db')):
+            st.error(f"Shard catalog not found in {SHARD_DIR}. Please run shard_database.py first.")
+            st.stop()
+    elif not os.path.exists(DB_PATH):
         st.error("Database not found. Please run setup_database.py first.")
         st.stop()
-    return CrimeDataProcessor()
+    startup = ThreadPoolExecutor(max_workers=1, thread_name_prefix='startup')
+    processor_future = startup.submit(load_data_processor)
+    startup.shutdown(wait=False)
+    return processor_future
 
-processor = init_data_processor()
-
-# Toronto official colors
-TORONTO_BLUE = "#003F7F"
-TORONTO_LIGHT_BLUE = "#0066CC"
-TORONTO_GRAY = "#666666"
-TORONTO_LIGHT_GRAY = "#F5F5F5"
+processor_future = start_data_processor()
 
 # Custom CSS styling
 st.markdown(f"""
@@ -204,10 +232,23 @@ st.markdown(f"""
 </style>
 """, unsafe_allow_html=True)
 
+LOGO_WIDTH = 200
+
+@st.cache_resource
+def load_logo():
+    """The logo resized once to its display width, so reruns don't resize it again"""
+    from PIL import Image
+    import io
+    logo = Image.open("assets/tpsr-logo.jpg")
+    logo = logo.resize((LOGO_WIDTH, round(logo.height * LOGO_WIDTH / logo.width)), resample=Image.BILINEAR)
+    buffer = io.BytesIO()
+    logo.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
 # Header section
 col1, col2 = st.columns([1, 4])
 with col1:
-    st.image("assets/tpsr-logo.jpg", width=200)
+    st.image(load_logo(), width=LOGO_WIDTH)
 with col2:
     st.markdown("""
     <div class="toronto-header">
@@ -222,8 +263,8 @@ st.markdown('<div class="filter-title">📊 Data Analysis Parameters</div>', uns
 
 col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
 
-neighborhoods = ['All Districts', 'Downtown Core', 'Scarborough', 'North York', 'Etobicoke', 'East York', 'York', 'Old Toronto']
-crime_types = ['All Types', 'Auto Theft', 'Drug Offenses', 'Assault', 'Break & Enter', 'Robbery', 'Fraud', 'Vandalism']
+neighborhoods = ['Downtown Core', 'Scarborough', 'North York', 'Etobicoke', 'East York', 'York', 'Old Toronto']
+crime_types = ['Auto Theft', 'Drug Offenses', 'Assault', 'Break & Enter', 'Robbery', 'Fraud', 'Vandalism']
 date_ranges = {
     'Last 3 Months': '3months',
     'Last 6 Months': '6months', 
@@ -232,17 +273,19 @@ date_ranges = {
 }
 
 with col1:
-    neighborhood_selection = st.selectbox(
+    neighborhood_selection = st.multiselect(
         "District/Neighborhood",
         neighborhoods,
-        index=neighborhoods.index(st.session_state.neighborhood)
+        default=st.session_state.neighborhoods,
+        placeholder=ALL_NEIGHBORHOODS
     )
 
 with col2:
-    crime_type_selection = st.selectbox(
+    crime_type_selection = st.multiselect(
         "Incident Type",
         crime_types,
-        index=crime_types.index(st.session_state.crime_type)
+        default=st.session_state.crime_types,
+        placeholder=ALL_CRIME_TYPES
     )
 
 with col3:
@@ -256,37 +299,147 @@ with col4:
     st.markdown("<br>", unsafe_allow_html=True)
     # This button updates the dashboard with new filter selections
     if st.button("🔄 Update Analysis", type="primary"):
-        st.session_state.neighborhood = neighborhood_selection
-        st.session_state.crime_type = crime_type_selection
+        st.session_state.neighborhoods = neighborhood_selection
+        st.session_state.crime_types = crime_type_selection
         st.session_state.date_range = date_ranges[date_range_selection]
         st.session_state.filters_applied = True
         st.rerun()
 
+live_updates = st.toggle(
+    "🟢 Live updates",
+    value=False,
+    help="Refresh automatically when new incidents are ingested"
+)
+
 st.markdown('</div>', unsafe_allow_html=True)
+instrumentation.record_timing('paint.controls', time.perf_counter() - rerun_started)
+
+# Everything below needs data, so wait for the background start-up here
+try:
+    if processor_future.done():
+        processor = processor_future.result()
+    else:
+        with st.spinner("Loading crime data..."):
+            processor = processor_future.result()
+except Exception:
+    # Don't keep a failed start-up around; the next rerun tries again
+    start_data_processor.clear()
+    raise
+
+def selection_label(values, all_label):
+    """Readable label for a multi-select filter value"""
+    return ", ".join(values) if values else all_label
+
+# Filters are passed as sorted tuples so the cache key doesn't depend on click order
+selected_neighborhoods = tuple(sorted(st.session_state.neighborhoods))
+selected_crime_types = tuple(sorted(st.session_state.crime_types))
+
+# The data version (generation and ingest watermark) is part of every cache
+# key, so new incidents or a rebuilt database invalidate cached results
+# instead of waiting for a manual update
+data_version = processor.get_data_version()
+
+# Longest series sent to the browser per chart; longer ones are downsampled
+MAX_CHART_POINTS = 400
+
+# Days scanned for anomaly alerts
+ANOMALY_DAYS = 30
 
 # Data loading functions - cached for performance
 @st.cache_data
-def load_safety_metrics(neighborhood, crime_type, date_range):
-    return processor.get_safety_metrics(neighborhood, crime_type, date_range)
+def load_live_snapshot(neighborhood, crime_type, date_range, data_version):
+    # Applies only the newly ingested incidents to the processor's running totals
+    return processor.get_live_snapshot(neighborhood, crime_type, date_range)
 
 @st.cache_data
-def load_neighborhood_comparison(crime_type, date_range):
-    return processor.get_neighborhood_comparison(crime_type, date_range)
+def load_neighborhood_classification(crime_type, date_range, data_version):
+    return processor.get_neighborhood_risk_classification(crime_type, date_range)
 
 @st.cache_data
-def load_monthly_trends(neighborhood, crime_type, date_range):
-    return processor.get_monthly_trends(neighborhood, crime_type, date_range)
+def load_risk_thresholds():
+    return processor.get_risk_thresholds()
 
 @st.cache_data
-def load_crime_distribution(neighborhood, date_range):
+def load_incident_trends(neighborhood, crime_type, date_range, granularity, data_version):
+    return processor.get_incident_trends(neighborhood, crime_type, date_range, granularity)
+
+@st.cache_data
+def load_chart_trends(neighborhood, crime_type, date_range, granularity, zoom, data_version):
+    return processor.get_chart_trends(
+        neighborhood, crime_type, date_range, granularity, max_points=MAX_CHART_POINTS, zoom=zoom
+    )
+
+@st.cache_data
+def load_crime_matrix(neighborhood, crime_type, date_range, data_version):
+    return processor.get_crime_matrix(neighborhood, crime_type, date_range)
+
+@st.cache_data
+def load_anomalies(today, data_version):
+    # today is part of the key so the scan moves on at midnight without new data
+    return processor.get_anomalies(days=ANOMALY_DAYS)
+
+@st.cache_data
+def load_crime_distribution(neighborhood, date_range, data_version):
     return processor.get_crime_type_distribution(neighborhood, date_range)
 
 @st.cache_data
-def load_response_analysis(neighborhood, date_range):
+def load_response_analysis(neighborhood, date_range, data_version):
     return processor.get_response_time_analysis(neighborhood, date_range)
 
+# Figure specs are cached per (filters, data version) on top of the data
+# cache, so reruns with unchanged data skip Plotly Express (st.plotly_chart
+# still validates the spec, see show_figure)
+@st.cache_data
+def load_crime_distribution_figure(neighborhood, date_range, data_version):
+    return charts.crime_distribution_pie(load_crime_distribution(neighborhood, date_range, data_version))
+
+@st.cache_data
+def load_district_rate_figure(crime_type, date_range, data_version):
+    return charts.district_rate_bar(
+        load_neighborhood_classification(crime_type, date_range, data_version),
+        selection_label(crime_type, ALL_CRIME_TYPES)
+    )
+
+@st.cache_data
+def load_crime_matrix_figure(neighborhood, crime_type, date_range, metric, data_version):
+    return charts.crime_matrix_heatmap(load_crime_matrix(neighborhood, crime_type, date_range, data_version), metric)
+
+@st.cache_data
+def load_response_trend_figure(neighborhood, date_range, data_version):
+    monthly_response, _ = load_response_analysis(neighborhood, date_range, data_version)
+    return charts.response_trend_line(monthly_response)
+
+@st.cache_data
+def load_district_response_figure(neighborhood, date_range, data_version):
+    _, neighborhood_response = load_response_analysis(neighborhood, date_range, data_version)
+    return charts.district_response_bar(neighborhood_response)
+
+@st.cache_data
+def load_trend_figure(neighborhood, crime_type, date_range, granularity, zoom, data_version):
+    if granularity in ('day', 'week'):
+        chart_data, _ = load_chart_trends(neighborhood, crime_type, date_range, granularity, zoom, data_version)
+    elif granularity == 'month':
+        monthly, _ = load_live_snapshot(neighborhood, crime_type, date_range, data_version)
+        chart_data = monthly.rename(columns={'year_month': 'period'})
+    else:
+        chart_data = load_incident_trends(neighborhood, crime_type, date_range, granularity, data_version)
+    x_title = "Week Starting" if granularity == 'week' else granularity.title()
+    return charts.incident_trend_area(chart_data, x_title)
+
+def show_figure(name, load_figure, *args):
+    """Draw a cached figure spec, counting whether it had to be built"""
+    builds_before = instrumentation.call_count(f"figure_build.{name}")
+    spec = load_figure(*args)
+    built = instrumentation.call_count(f"figure_build.{name}") > builds_before
+    instrumentation.record_cache(f"figure.{name}", hit=not built)
+    # plotly_chart validates the spec into a Figure on every rerun, cached or not
+    with instrumentation.timed(f"figure_render.{name}"):
+        st.plotly_chart(spec, use_container_width=True)
+
 # Load current data
-metrics = load_safety_metrics(st.session_state.neighborhood, st.session_state.crime_type, st.session_state.date_range)
+monthly_trends, metrics = load_live_snapshot(
+    selected_neighborhoods, selected_crime_types, st.session_state.date_range, data_version
+)
 
 # Key Performance Indicators
 st.markdown("## 📈 Key Performance Indicators")
@@ -294,8 +447,8 @@ st.markdown("## 📈 Key Performance Indicators")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    change_indicator = "↓" if metrics['change_percent'] &lt; 0 else "↑"
-    change_color = "#10B981" if metrics['change_percent'] &lt; 0 else "#EF4444"
+    change_indicator = "↓" if metrics['change_percent'] < 0 else "↑"
+    change_color = "#10B981" if metrics['change_percent'] < 0 else "#EF4444"
     st.markdown(f"""
     <div class="metric-container">
         <p class="metric-label">Total Incidents</p>
@@ -307,14 +460,19 @@ with col1:
     """, unsafe_allow_html=True)
 
 with col2:
-    response_indicator = "↓" if metrics['response_change'] &lt; 0 else "↑"
-    response_color = "#10B981" if metrics['response_change'] &lt; 0 else "#EF4444"
+    response_indicator = "↓" if metrics['response_change'] < 0 else "↑"
+    response_color = "#10B981" if metrics['response_change'] < 0 else "#EF4444"
+    # NaN when none of the selected incidents has a recorded response time
+    response_recorded = not math.isnan(metrics['avg_response_time'])
+    response_time_label = f"{metrics['avg_response_time']:.1f} min" if response_recorded else "No data"
+    response_delta = (f"{response_indicator} {abs(metrics['response_change']):.1f}% vs previous period"
+                      if response_recorded else "No response times recorded")
     st.markdown(f"""
     <div class="metric-container">
         <p class="metric-label">Average Response Time</p>
-        <p class="metric-value">{metrics['avg_response_time']:.1f} min</p>
+        <p class="metric-value">{response_time_label}</p>
         <p class="metric-delta" style="color: {response_color};">
-            {response_indicator} {abs(metrics['response_change']):.1f}% vs previous period
+            {response_delta}
         </p>
     </div>
     """, unsafe_allow_html=True)
@@ -343,18 +501,42 @@ with col4:
     </div>
     """, unsafe_allow_html=True)
 
+# The KPI cards are the first data on screen
+instrumentation.record_timing('paint.kpis', time.perf_counter() - rerun_started)
+
+# Anomaly alerts: unusual daily spikes in any district and incident type,
+# regardless of the filters above
+anomalies = load_anomalies(datetime.now().strftime('%Y-%m-%d'), data_version)
+with st.expander(f"🚨 Anomaly Alerts ({len(anomalies)})", expanded=not anomalies.empty):
+    if anomalies.empty:
+        st.markdown(f"✅ No unusual spikes in the last {ANOMALY_DAYS} days.")
+    else:
+        st.markdown(f"Days in the last {ANOMALY_DAYS} days where a district's incidents of one type were far above "
+                    "the usual level for that weekday.")
+        st.dataframe(
+            anomalies.rename(columns={
+                'incident_date': 'Date',
+                'neighborhood': 'District',
+                'crime_type': 'Incident Type',
+                'incidents': 'Incidents',
+                'baseline': 'Usual (same weekday)',
+                'z_score': 'Z-Score'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
 # Analysis tabs
 st.markdown("## 📊 Detailed Analysis")
 
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📋 Executive Summary", 
     "🗺️ District Analysis", 
     "⏱️ Response Performance", 
-    "📈 Trend Analysis"
+    "📈 Trend Analysis",
+    "🔎 Incident Records"
 ])
 
-TORONTO_COLORS = [TORONTO_BLUE, TORONTO_LIGHT_BLUE, "#0080FF", "#4D94FF", "#80B3FF", "#B3D1FF", "#E6F0FF"]
-
 # Tab 1: Executive Summary
 with tab1:
     col1, col2 = st.columns([1, 1])
@@ -363,66 +545,29 @@ with tab1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="chart-title">Incident Type Distribution</div>', unsafe_allow_html=True)
         
-        crime_dist = load_crime_distribution(st.session_state.neighborhood, st.session_state.date_range)
-        
-        fig_pie = px.pie(
-            crime_dist, 
-            values='count', 
-            names='crime_type',
-            color_discrete_sequence=TORONTO_COLORS
-        )
-        fig_pie.update_traces(
-            textposition='inside', 
-            textinfo='percent+label',
-            textfont_size=12
-        )
-        fig_pie.update_layout(
-            showlegend=True,
-            legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05),
-            margin=dict(l=20, r=20, t=20, b=20),
-            font=dict(family="Arial", size=12, color=TORONTO_BLUE)
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
+        show_figure('crime_distribution', load_crime_distribution_figure,
+                    selected_neighborhoods, st.session_state.date_range, data_version)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="chart-title">Priority Classifications</div>', unsafe_allow_html=True)
         
-        # Classify crimes by priority level
-        priority_data = []
-        for _, row in crime_dist.iterrows():
-            if row['crime_type'] in ['Auto Theft', 'Drug Offenses']:
-                priority = 'High Priority'
-                color = '#EF4444'
-            elif row['crime_type'] in ['Break & Enter', 'Fraud', 'Assault']:
-                priority = 'Medium Priority'
-                color = '#F59E0B'
-            else:
-                priority = 'Standard Priority'
-                color = '#10B981'
-            
-            priority_data.append({
-                'Crime Type': row['crime_type'],
-                'Count': row['count'],
-                'Percentage': row['percentage'],
-                'Priority': priority,
-                'Color': color
-            })
-        
-        priority_df = pd.DataFrame(priority_data)
+        # Priority tiers come from the crime_type_priorities config table
+        crime_dist = load_crime_distribution(selected_neighborhoods, st.session_state.date_range, data_version)
+        priority_colors = {'High Priority': '#EF4444', 'Medium Priority': '#F59E0B', 'Standard Priority': '#10B981'}
         
         for priority in ['High Priority', 'Medium Priority', 'Standard Priority']:
-            subset = priority_df[priority_df['Priority'] == priority]
+            subset = crime_dist[crime_dist['priority'] == priority]
             if not subset.empty:
-                color = subset.iloc[0]['Color']
+                color = priority_colors[priority]
                 st.markdown(f"""
                 <div style="border-left: 4px solid {color}; padding-left: 1rem; margin-bottom: 1rem;">
                     <h4 style="color: {color}; margin: 0;">{priority}</h4>
                 """, unsafe_allow_html=True)
                 
                 for _, row in subset.iterrows():
-                    st.markdown(f"• **{row['Crime Type']}**: {row['Count']} incidents ({row['Percentage']:.1f}%)")
+                    st.markdown(f"• **{row['crime_type']}**: {row['count']} incidents ({row['percentage']:.1f}%)")
                 
                 st.markdown("</div>", unsafe_allow_html=True)
         
@@ -433,98 +578,67 @@ with tab2:
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.markdown('<div class="chart-title">District Performance Comparison</div>', unsafe_allow_html=True)
     
-    neighborhood_data = load_neighborhood_comparison(st.session_state.crime_type, st.session_state.date_range)
-    
-    color_map = {'Low': '#10B981', 'Medium': '#F59E0B', 'High': '#EF4444'}
+    show_figure('district_rates', load_district_rate_figure,
+                selected_crime_types, st.session_state.date_range, data_version)
     
-    fig_bar = px.bar(
-        neighborhood_data,
-        x='neighborhood',
-        y='incidents',
-        color='risk_level',
-        color_discrete_map=color_map,
-        title=f"Incident Count by District - {st.session_state.crime_type}",
-        labels={'incidents': 'Number of Incidents', 'neighborhood': 'District'}
-    )
-    fig_bar.update_layout(
-        xaxis_tickangle=-45,
-        font=dict(family="Arial", size=12, color=TORONTO_BLUE),
-        plot_bgcolor='white',
-        paper_bgcolor='white'
-    )
-    st.plotly_chart(fig_bar, use_container_width=True)
+    # Criteria are read from the risk_thresholds config table
+    thresholds = load_risk_thresholds()
+    per_capita = thresholds[thresholds['metric'] == 'incidents_per_100k'].set_index('tier')['min_value']
+    per_km2 = thresholds[thresholds['metric'] == 'incidents_per_km2'].set_index('tier')['min_value']
     
-    st.markdown("**Risk Classification Criteria:**")
+    st.markdown("**Risk Classification Criteria** (annualized incidents per 100k residents):")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.markdown("🔴 **High Risk**: >300 incidents")
+        st.markdown(f"🔴 **High Risk**: ≥{per_capita['High']:g} per 100k")
     with col2:
-        st.markdown("🟡 **Medium Risk**: 150-300 incidents")
+        st.markdown(f"🟡 **Medium Risk**: {per_capita['Medium']:g}-{per_capita['High']:g} per 100k")
     with col3:
-        st.markdown("🟢 **Low Risk**: &lt;150 incidents")
+        st.markdown(f"🟢 **Low Risk**: <{per_capita['Medium']:g} per 100k")
+    st.markdown(
+        f"Districts at ≥{per_km2['High']:g} incidents per km² per year are also flagged High Priority for density."
+    )
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Every district against every incident type, from one grouped query
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="chart-title">District × Incident Type Matrix</div>', unsafe_allow_html=True)
+    
+    matrix_metrics = {
+        'Incidents': 'incidents',
+        'Avg Response Time': 'avg_response_time',
+        'Change vs Previous Period': 'change_percent'
+    }
+    matrix_label = st.radio("Matrix Metric", list(matrix_metrics.keys()), horizontal=True)
+    crime_matrix = load_crime_matrix(
+        selected_neighborhoods, selected_crime_types, st.session_state.date_range, data_version
+    )
+    if crime_matrix.empty:
+        st.info("No incidents match the current filters.")
+    else:
+        show_figure('crime_matrix', load_crime_matrix_figure, selected_neighborhoods, selected_crime_types,
+                    st.session_state.date_range, matrix_metrics[matrix_label], data_version)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Tab 3: Response Performance
 with tab3:
-    monthly_response, neighborhood_response = load_response_analysis(st.session_state.neighborhood, st.session_state.date_range)
-    
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="chart-title">Monthly Response Time Trends</div>', unsafe_allow_html=True)
         
-        fig_line = px.line(
-            monthly_response,
-            x='year_month',
-            y='response_time_minutes',
-            line_shape='spline',
-            color_discrete_sequence=[TORONTO_BLUE]
-        )
-        fig_line.add_hline(
-            y=8.0, 
-            line_dash="dash", 
-            line_color="#EF4444",
-            annotation_text="8-minute target",
-            annotation_position="top right"
-        )
-        fig_line.update_layout(
-            xaxis_title="Month",
-            yaxis_title="Response Time (minutes)",
-            font=dict(family="Arial", size=12, color=TORONTO_BLUE),
-            plot_bgcolor='white',
-            paper_bgcolor='white'
-        )
-        st.plotly_chart(fig_line, use_container_width=True)
+        show_figure('response_trend', load_response_trend_figure,
+                    selected_neighborhoods, st.session_state.date_range, data_version)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="chart-title">District Response Performance</div>', unsafe_allow_html=True)
         
-        fig_bar_response = px.bar(
-            neighborhood_response,
-            x='neighborhood',
-            y='response_time_minutes',
-            color_discrete_sequence=[TORONTO_LIGHT_BLUE]
-        )
-        fig_bar_response.add_hline(
-            y=8.0, 
-            line_dash="dash", 
-            line_color="#EF4444",
-            annotation_text="Target: 8 min",
-            annotation_position="top right"
-        )
-        fig_bar_response.update_layout(
-            xaxis_tickangle=-45,
-            xaxis_title="District",
-            yaxis_title="Response Time (minutes)",
-            font=dict(family="Arial", size=12, color=TORONTO_BLUE),
-            plot_bgcolor='white',
-            paper_bgcolor='white'
-        )
-        st.plotly_chart(fig_bar_response, use_container_width=True)
+        show_figure('district_response', load_district_response_figure,
+                    selected_neighborhoods, st.session_state.date_range, data_version)
         st.markdown('</div>', unsafe_allow_html=True)
 
 # Tab 4: Trend Analysis
@@ -532,23 +646,42 @@ with tab4:
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.markdown('<div class="chart-title">Incident Trend Analysis</div>', unsafe_allow_html=True)
     
-    trend_data = load_monthly_trends(st.session_state.neighborhood, st.session_state.crime_type, st.session_state.date_range)
+    granularities = {'Day': 'day', 'Week': 'week', 'Month': 'month', 'Quarter': 'quarter'}
+    granularity_label = st.radio("Time Granularity", list(granularities.keys()), index=2, horizontal=True)
+    granularity = granularities[granularity_label]
+    
+    # Monthly buckets come from the incrementally maintained live snapshot;
+    # other granularities are bucketed in the database
+    if granularity == 'month':
+        trend_data = monthly_trends.rename(columns={'year_month': 'period'})
+    else:
+        trend_data = load_incident_trends(
+            selected_neighborhoods, selected_crime_types, st.session_state.date_range, granularity, data_version
+        )
     
-    fig_area = px.area(
-        trend_data,
-        x='year_month',
-        y='incidents',
-        color_discrete_sequence=[TORONTO_LIGHT_BLUE]
-    )
-    fig_area.update_layout(
-        xaxis_tickangle=-45,
-        xaxis_title="Month",
-        yaxis_title="Number of Incidents",
-        font=dict(family="Arial", size=12, color=TORONTO_BLUE),
-        plot_bgcolor='white',
-        paper_bgcolor='white'
-    )
-    st.plotly_chart(fig_area, use_container_width=True)
+    # Long daily/weekly series are downsampled for the chart; zooming into a
+    # narrower window refetches it at full resolution
+    zoom = None
+    if granularity in ('day', 'week'):
+        window_start, window_end = processor.get_date_window(st.session_state.date_range)
+        full_window = (window_start.date(), window_end.date())
+        zoom_window = st.slider(
+            "Zoom Window",
+            min_value=full_window[0],
+            max_value=full_window[1],
+            value=full_window,
+            format="MMM D, YYYY"
+        )
+        zoom = None if zoom_window == full_window else (zoom_window[0].isoformat(), zoom_window[1].isoformat())
+        chart_data, downsampled = load_chart_trends(
+            selected_neighborhoods, selected_crime_types, st.session_state.date_range, granularity, zoom, data_version
+        )
+        if downsampled:
+            st.caption(f"Showing {len(chart_data)} representative points that preserve peaks - "
+                       "narrow the zoom window for full resolution.")
+    
+    show_figure('incident_trend', load_trend_figure, selected_neighborhoods, selected_crime_types,
+                st.session_state.date_range, granularity, zoom, data_version)
     
     # Statistical summary
     if len(trend_data) > 0:
@@ -560,7 +693,7 @@ with tab4:
             max_incidents = trend_data['incidents'].max()
             min_incidents = trend_data['incidents'].min()
             
-            st.markdown(f"• **Average**: {avg_incidents:.1f} incidents/month")
+            st.markdown(f"• **Average**: {avg_incidents:.1f} incidents/{granularity}")
             st.markdown(f"• **Peak**: {max_incidents} incidents")
             st.markdown(f"• **Minimum**: {min_incidents} incidents")
         
@@ -571,19 +704,130 @@ with tab4:
             
             if recent_trend > overall_avg * 1.1:
                 st.markdown("⚠️ **Recent Trend**: Increasing incidents")
-            elif recent_trend &lt; overall_avg * 0.9:
+            elif recent_trend < overall_avg * 0.9:
                 st.markdown("✅ **Recent Trend**: Decreasing incidents")
             else:
                 st.markdown("📊 **Recent Trend**: Stable pattern")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Tab 5: Incident Records
+with tab5:
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="chart-title">Incident Records</div>', unsafe_allow_html=True)
+    
+    # Keep a stack of page cursors for the current filters; changing filters starts over
+    filter_key = (selected_neighborhoods, selected_crime_types, st.session_state.date_range)
+    if st.session_state.get('incident_filter_key') != filter_key:
+        st.session_state.incident_filter_key = filter_key
+        st.session_state.incident_cursors = [None]
+    
+    INCIDENT_PAGE_SIZE = 50
+    page_number = len(st.session_state.incident_cursors)
+    incident_page, next_cursor = processor.get_incident_page(
+        selected_neighborhoods,
+        selected_crime_types,
+        st.session_state.date_range,
+        page_size=INCIDENT_PAGE_SIZE,
+        after=st.session_state.incident_cursors[-1]
+    )
+    
+    incident_page = incident_page.rename(columns={
+        'id': 'Incident ID',
+        'incident_date': 'Date',
+        'neighborhood': 'District',
+        'crime_type': 'Incident Type',
+        'response_time_minutes': 'Response Time (min)',
+        'severity': 'Severity'
+    })
+    if not incident_page.empty:
+        incident_page['Date'] = incident_page['Date'].dt.strftime('%Y-%m-%d')
+    st.dataframe(incident_page, use_container_width=True, hide_index=True)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("← Newer", disabled=page_number == 1):
+            st.session_state.incident_cursors.pop()
+            st.rerun()
+    with col2:
+        st.markdown(f"<p style='text-align: center; color: {TORONTO_GRAY};'>Page {page_number}</p>", unsafe_allow_html=True)
+    with col3:
+        if st.button("Older →", disabled=next_cursor is None):
+            st.session_state.incident_cursors.append(next_cursor)
+            st.rerun()
+
+    # Export every matching incident, streamed to a temporary file chunk by chunk
+    with st.expander("📥 Export Filtered Incidents"):
+        export_format = st.radio("File format", ['csv', 'parquet'], format_func=str.upper, horizontal=True)
+
+        if st.button("Prepare Export"):
+            progress_bar = st.progress(0.0, text="Exporting incidents...")
+
+            def show_export_progress(rows_written, total_rows):
+                fraction = rows_written / total_rows if total_rows else 1.0
+                progress_bar.progress(min(fraction, 1.0), text=f"Exported {rows_written:,} of {total_rows:,} incidents")
+
+            export_file = tempfile.NamedTemporaryFile(suffix=f".{export_format}", delete=False)
+            export_file.close()
+            try:
+                rows_exported = processor.export_filtered_data(
+                    export_file.name,
+                    export_format,
+                    neighborhood=selected_neighborhoods,
+                    crime_type=selected_crime_types,
+                    date_range=st.session_state.date_range,
+                    progress_callback=show_export_progress
+                )
+            except ImportError as error:
+                st.error(str(error))
+            else:
+                progress_bar.progress(1.0, text=f"Exported {rows_exported:,} incidents")
+                # The download button keeps the whole file in server memory;
+                # for very large exports use scripts/export_incidents.py
+                with open(export_file.name, 'rb') as exported:
+                    st.download_button(
+                        "⬇️ Download",
+                        exported,
+                        file_name=f"toronto_incidents_{st.session_state.date_range}.{export_format}",
+                        mime='text/csv' if export_format == 'csv' else 'application/octet-stream'
+                    )
+            finally:
+                os.remove(export_file.name)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Rerun timings and figure cache hit rates, for profiling the dashboard
+instrumentation.record_timing('page_render', time.perf_counter() - rerun_started)
+if os.environ.get('TORONTO_CRIME_PROFILE'):
+    import pandas as pd
+    with st.expander("⏱️ Performance"):
+        timings = pd.DataFrame.from_dict(instrumentation.timing_summary(), orient='index')
+        cache_stats = pd.DataFrame.from_dict(instrumentation.cache_summary(), orient='index')
+        st.markdown("**Timings**")
+        st.dataframe(timings.round(2), use_container_width=True)
+        st.markdown("**Cache Hit Rates**")
+        st.dataframe(cache_stats, use_container_width=True)
+
 # Footer
 st.markdown(f"""
 <div class="toronto-footer">
     <p><strong>Toronto Public Safety Reporting System</strong></p>
     <p>Data Source: Toronto Police Service (TPS) • Toronto Emergency Medical Services</p>
-    <p>Last Updated: {pd.Timestamp.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+    <p>Last Updated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
     <p>© 2024 City of Toronto. All rights reserved.</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Live updates: keep polling the cheap data version and rerun as soon as new
+# incidents land. Cached loaders are keyed by the version, so the rerun only
+# recomputes what changed. Updating the status line each poll also lets
+# Streamlit interrupt the loop when the user interacts with the page.
+LIVE_POLL_SECONDS = 2
+
+if live_updates:
+    live_status = st.empty()
+    while True:
+        time.sleep(LIVE_POLL_SECONDS)
+        if processor.get_data_version() != data_version:
+            st.rerun()
+        live_status.caption(f"🟢 Live - last checked {datetime.now().strftime('%I:%M:%S %p')}")
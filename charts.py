@@ -0,0 +1,214 @@
+"""
+Chart builders for the Toronto Public Safety Dashboard.
+
+Each builder turns a query result into a plain-dict Plotly figure spec
+styled with the shared Toronto template. The dashboard caches these specs
+per filter selection and data version, so reruns that don't change the
+data skip Plotly Express. A cache hit only saves that construction:
+st.plotly_chart still validates the spec into a Figure on every rerun.
+Build times are recorded in the instrumentation module under
+"figure_build.<name>", and the dashboard records drawing times under
+"figure_render.<name>".
+
+Plotly is imported by the first chart, so importing this module for its
+colors doesn't slow down the dashboard's cold start.
+"""
+
+from functools import lru_cache
+
+import instrumentation
+
+# Toronto official colors
+TORONTO_BLUE = "#003F7F"
+TORONTO_LIGHT_BLUE = "#0066CC"
+TORONTO_GRAY = "#666666"
+TORONTO_LIGHT_GRAY = "#F5F5F5"
+
+TORONTO_COLORS = [TORONTO_BLUE, TORONTO_LIGHT_BLUE, "#0080FF", "#4D94FF", "#80B3FF", "#B3D1FF", "#E6F0FF"]
+
+RISK_COLORS = {'Low': '#10B981', 'Medium': '#F59E0B', 'High': '#EF4444'}
+
+# Target response time drawn on the response charts (minutes)
+RESPONSE_TARGET_MINUTES = 8.0
+
+
+@lru_cache(maxsize=None)
+def toronto_template():
+    """Plotly's default look with the Toronto font, colors and white backgrounds"""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    template = go.layout.Template(pio.templates['plotly'])
+    template.layout.update(
+        font=dict(family="Arial", size=12, color=TORONTO_BLUE),
+        colorway=TORONTO_COLORS,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return template
+
+
+def _figure_spec(name, build):
+    """Run a figure builder, timing it, and return its spec as a plain dict"""
+    import plotly.express as px
+
+    template = toronto_template()
+    with instrumentation.timed(f"figure_build.{name}"):
+        return build(px, template).to_dict()
+
+
+def crime_distribution_pie(crime_dist):
+    """Incident type distribution pie chart"""
+    def build(px, template):
+        fig = px.pie(
+            crime_dist,
+            values='count',
+            names='crime_type',
+            color_discrete_sequence=TORONTO_COLORS,
+            template=template
+        )
+        fig.update_traces(
+            textposition='inside',
+            textinfo='percent+label',
+            textfont_size=12
+        )
+        fig.update_layout(
+            showlegend=True,
+            legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05),
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        return fig
+
+    return _figure_spec('crime_distribution', build)
+
+
+def district_rate_bar(neighborhood_data, crime_type_label):
+    """Annualized incidents per 100k residents by district, colored by risk level"""
+    def build(px, template):
+        fig = px.bar(
+            neighborhood_data,
+            x='neighborhood',
+            y='incidents_per_100k',
+            color='risk_level',
+            color_discrete_map=RISK_COLORS,
+            category_orders={'risk_level': ['High', 'Medium', 'Low']},
+            hover_data=['incidents', 'incidents_per_km2', 'avg_response_time', 'priority'],
+            title=f"Annualized Incidents per 100k Residents - {crime_type_label}",
+            labels={
+                'incidents_per_100k': 'Incidents per 100k / year',
+                'incidents_per_km2': 'Incidents per km² / year',
+                'incidents': 'Number of Incidents',
+                'neighborhood': 'District'
+            },
+            template=template
+        )
+        fig.update_layout(xaxis_tickangle=-45)
+        return fig
+
+    return _figure_spec('district_rates', build)
+
+
+def response_trend_line(monthly_response):
+    """Monthly average response time against the target"""
+    def build(px, template):
+        fig = px.line(
+            monthly_response,
+            x='year_month',
+            y='response_time_minutes',
+            line_shape='spline',
+            color_discrete_sequence=[TORONTO_BLUE],
+            template=template
+        )
+        fig.add_hline(
+            y=RESPONSE_TARGET_MINUTES,
+            line_dash="dash",
+            line_color="#EF4444",
+            annotation_text="8-minute target",
+            annotation_position="top right"
+        )
+        fig.update_layout(
+            xaxis_title="Month",
+            yaxis_title="Response Time (minutes)"
+        )
+        return fig
+
+    return _figure_spec('response_trend', build)
+
+
+def district_response_bar(neighborhood_response):
+    """Average response time by district against the target"""
+    def build(px, template):
+        fig = px.bar(
+            neighborhood_response,
+            x='neighborhood',
+            y='response_time_minutes',
+            color_discrete_sequence=[TORONTO_LIGHT_BLUE],
+            template=template
+        )
+        fig.add_hline(
+            y=RESPONSE_TARGET_MINUTES,
+            line_dash="dash",
+            line_color="#EF4444",
+            annotation_text="Target: 8 min",
+            annotation_position="top right"
+        )
+        fig.update_layout(
+            xaxis_tickangle=-45,
+            xaxis_title="District",
+            yaxis_title="Response Time (minutes)"
+        )
+        return fig
+
+    return _figure_spec('district_response', build)
+
+
+def incident_trend_area(trend_data, x_title):
+    """Incident counts per period as an area chart"""
+    def build(px, template):
+        fig = px.area(
+            trend_data,
+            x='period',
+            y='incidents',
+            color_discrete_sequence=[TORONTO_LIGHT_BLUE],
+            template=template
+        )
+        fig.update_layout(
+            xaxis_tickangle=-45,
+            xaxis_title=x_title,
+            yaxis_title="Number of Incidents"
+        )
+        return fig
+
+    return _figure_spec('incident_trend', build)
+
+
+# Heatmap settings for each crime matrix metric: label, color scale, midpoint
+MATRIX_METRICS = {
+    'incidents': ('Incidents', 'Blues', None),
+    'avg_response_time': ('Avg Response (min)', 'YlOrRd', None),
+    'change_percent': ('Change vs Previous (%)', 'RdYlGn_r', 0),
+}
+
+
+def crime_matrix_heatmap(matrix, metric):
+    """District x incident type heatmap of one crime matrix metric"""
+    def build(px, template):
+        label, color_scale, midpoint = MATRIX_METRICS[metric]
+        grid = matrix.pivot(index='neighborhood', columns='crime_type', values=metric)
+        fig = px.imshow(
+            grid,
+            labels=dict(x='Incident Type', y='District', color=label),
+            color_continuous_scale=color_scale,
+            color_continuous_midpoint=midpoint,
+            aspect='auto',
+            # Cell labels only while they stay readable
+            text_auto=grid.size <= 150,
+            template=template
+        )
+        fig.update_layout(
+            xaxis_tickangle=-45,
+            height=max(400, 22 * len(grid))
+        )
+        return fig
+
+    return _figure_spec('crime_matrix', build)
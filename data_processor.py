@@ -1,29 +1,321 @@
+import os
 import sqlite3
+import threading
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from filters import ALL_NEIGHBORHOODS, ALL_CRIME_TYPES, normalize_selection
+
+# Fallback classification config for databases created before the
+# risk_thresholds / crime_type_priorities tables existed. These match the
+# rows seeded by scripts/setup_database.py.
+DEFAULT_RISK_THRESHOLDS = [
+    # (metric, tier, min_value) - rates are annualized incidents
+    ('incidents_per_100k', 'Low', 0.0),
+    ('incidents_per_100k', 'Medium', 75.0),
+    ('incidents_per_100k', 'High', 250.0),
+    ('incidents_per_km2', 'Low', 0.0),
+    ('incidents_per_km2', 'Medium', 5.0),
+    ('incidents_per_km2', 'High', 15.0),
+]
+DEFAULT_CRIME_TYPE_PRIORITIES = [
+    ('Auto Theft', 'High Priority'),
+    ('Drug Offenses', 'High Priority'),
+    ('Break & Enter', 'Medium Priority'),
+    ('Fraud', 'Medium Priority'),
+    ('Assault', 'Medium Priority'),
+    ('Robbery', 'Standard Priority'),
+    ('Vandalism', 'Standard Priority'),
+]
+
+# SQL expressions that map incident_date to a time bucket label.
+# Weeks are ISO weeks labelled by their Monday; incident_date has no time of
+# day, so there is no hour-of-day bucket.
+TIME_BUCKETS = {
+    'day': "incident_date",
+    'week': "date(incident_date, '-' || ((CAST(strftime('%w', incident_date) AS INTEGER) + 6) % 7) || ' days')",
+    'month': "strftime('%Y-%m', incident_date)",
+    'quarter': "strftime('%Y', incident_date) || '-Q' || ((CAST(strftime('%m', incident_date) AS INTEGER) + 2) / 3)",
+}
+
+# Anomaly detection compares each day with the same weekday over this many
+# previous weeks
+ANOMALY_BASELINE_WEEKS = 8
+
+# Columns written by the CSV/Parquet export
+EXPORT_COLUMNS = ['id', 'incident_date', 'neighborhood', 'crime_type', 'response_time_minutes',
+                  'severity', 'latitude', 'longitude']
+
+
+def build_filter_clause(neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES):
+    """
+    Build the neighborhood/crime type part of a WHERE clause.
+    Multiple values become a single IN-list so SQLite can use the indexes
+    instead of running one query per value.
+    """
+    clause = ""
+    params = []
+    for column, selection, all_label in (
+        ('neighborhood', neighborhood, ALL_NEIGHBORHOODS),
+        ('crime_type', crime_type, ALL_CRIME_TYPES),
+    ):
+        values = normalize_selection(selection, all_label)
+        if values is None:
+            continue
+        if len(values) == 1:
+            clause += f" AND {column} = ?"
+        else:
+            clause += f" AND {column} IN ({', '.join('?' * len(values))})"
+        params.extend(values)
+    return clause, params
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Largest-Triangle-Three-Buckets downsampling. Returns the indices of at
+    most max_points samples that keep the visual shape of the series,
+    including its peaks and troughs. x must be increasing.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    
+    # First and last points are always kept; the rest is split into buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = [0]
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        prev_x, prev_y = x[selected[-1]], y[selected[-1]]
+        
+        areas = np.abs((prev_x - avg_x) * (y[start:end] - prev_y) - (prev_x - x[start:end]) * (avg_y - prev_y))
+        selected.append(start + int(areas.argmax()))
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def minmax_indices(y, max_points):
+    """
+    Min/max envelope downsampling: keeps the lowest and highest sample of
+    each bucket, so every spike survives. Returns at most max_points indices.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(0, n, max_points // 2 + 1).astype(int)
+    selected = set()
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            selected.add(start + int(y[start:end].argmin()))
+            selected.add(start + int(y[start:end].argmax()))
+    return np.array(sorted(selected))
+
+
+def seasonal_zscores(counts, weeks):
+    """
+    Score every series of a (series x days) count array at once. Each day is
+    compared with the same weekday over the previous `weeks` weeks, so the
+    first 7 * weeks days only serve as history. Returns (baseline, zscores)
+    arrays for the remaining days.
+    """
+    history = 7 * weeks
+    days = counts.shape[1] - history
+    lagged = np.stack([counts[:, history - 7 * k:history - 7 * k + days] for k in range(1, weeks + 1)])
+    baseline = lagged.mean(axis=0)
+    # Daily counts are small, so a Poisson floor keeps a quiet series from
+    # turning a single incident into a huge z-score
+    spread = np.maximum(lagged.std(axis=0), np.sqrt(np.maximum(baseline, 1.0)))
+    return baseline, (counts[:, history:] - baseline) / spread
+
+
+class ShardRouter:
+    """
+    Routes crime_incidents queries across per-year (or per-quarter) SQLite
+    shard files created by scripts/shard_database.py.
+    The shard directory holds one file per period plus catalog.db, which
+    keeps the neighborhoods and config tables and a shard_ranges table
+    listing the date range each shard covers.
+    """
+    
+    def __init__(self, shard_dir, max_workers=None):
+        self.shard_dir = shard_dir
+        self.catalog_path = os.path.join(shard_dir, 'catalog.db')
+        if not os.path.exists(self.catalog_path):
+            raise FileNotFoundError(f"Shard catalog not found: {self.catalog_path}")
+        
+        conn = sqlite3.connect(self.catalog_path)
+        rows = conn.execute(
+            "SELECT file_name, start_date, end_date FROM shard_ranges ORDER BY start_date"
+        ).fetchall()
+        conn.close()
+        self.shards = [(os.path.join(shard_dir, file_name), start, end) for file_name, start, end in rows]
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or min(8, max(len(self.shards), 1)))
+    
+    def shards_for_window(self, start_date, end_date):
+        """Shard paths, oldest first, whose date range overlaps the window"""
+        return [path for path, shard_start, shard_end in self.shards
+                if shard_start <= end_date and shard_end >= start_date]
+    
+    def map(self, func, paths):
+        """Run func on each shard path in parallel, keeping the order of paths"""
+        if len(paths) == 1:
+            return [func(paths[0])]
+        return list(self.executor.map(func, paths))
+
 
 class CrimeDataProcessor:
     """
     Handles all database queries and data analysis for the crime dashboard.
     This class connects to the SQLite database and processes crime data
     based on user filter selections.
+    Pass shard_dir to read from year-sharded files instead of a single
+    database; results are the same as for the single-file layout.
     """
     
-    def __init__(self, db_path='toronto_crime.db'):
+    # How many filter combinations get_live_snapshot keeps aggregates for
+    LIVE_CACHE_SIZE = 64
+    
+    def __init__(self, db_path='toronto_crime.db', shard_dir=None, max_workers=None):
         self.db_path = db_path
+        self.shard_router = ShardRouter(shard_dir, max_workers) if shard_dir else None
+        
+        # Change detection state for get_data_version
+        self._version_lock = threading.Lock()
+        self._version_conn = None
+        self._last_data_version = None
+        self._generation = 0
+        self._watermark = 0
+        self._incident_count = 0
+        self._last_row = None
+        
+        # Whether the daily_rollups table can serve grouped queries
+        self._has_rollups = None
+        
+        # Incrementally maintained aggregates for get_live_snapshot
+        self._live_lock = threading.Lock()
+        self._live_cache = OrderedDict()
+        
+        # Incrementally maintained daily counts for get_anomalies
+        self._anomaly_lock = threading.Lock()
+        self._anomaly_state = None
     
     def get_connection(self):
-        """Create database connection"""
+        """Create database connection (to the shard catalog when sharded)"""
+        if self.shard_router:
+            return sqlite3.connect(self.shard_router.catalog_path)
         return sqlite3.connect(self.db_path)
     
-    def get_filtered_data(self, neighborhood='All Districts', crime_type='All Types', date_range='12months'):
+    def get_data_version(self):
         """
-        Get crime data based on user filter selections.
-        Returns pandas DataFrame with matching records.
+        Cheap check for changed data, returning a (generation, watermark)
+        token. The watermark is the highest incident id; appending incidents
+        (as the ingest service does) only raises it. Any other write, such as
+        a rebuilt database whose ids restart at 1, starts a new generation,
+        so incremental caches rebuild instead of adding to stale totals.
+        PRAGMA data_version on a long-lived connection only changes when
+        another connection commits, so the table is re-checked only after a write.
         """
-        conn = self.get_connection()
+        with self._version_lock:
+            if self.shard_router:
+                paths = [path for path, _, _ in self.shard_router.shards] or [self.shard_router.catalog_path]
+                # Shards are rewritten rather than appended to, so any modification is a new generation
+                return (max(os.stat(path).st_mtime_ns for path in paths),
+                        max(self._max_incident_id(path) for path in paths))
+            
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            data_version = self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version != self._last_data_version:
+                self._last_data_version = data_version
+                self._check_appended()
+            return self._generation, self._watermark
+    
+    def _check_appended(self):
+        """
+        Re-read the watermark after a write and start a new generation unless
+        the write only appended incidents: the id and row count must grow by
+        the same amount and the previous last incident must be unchanged.
+        """
+        conn = self._version_conn
+        watermark, count = conn.execute('SELECT COALESCE(MAX(id), 0), COUNT(*) FROM crime_incidents').fetchone()
+        previous_last_row = conn.execute(
+            'SELECT * FROM crime_incidents WHERE id = ?', (self._watermark,)
+        ).fetchone()
+        appended = (watermark > self._watermark
+                    and count - self._incident_count == watermark - self._watermark
+                    and previous_last_row == self._last_row)
+        if not appended:
+            self._generation += 1
+        self._watermark, self._incident_count = watermark, count
+        self._last_row = conn.execute('SELECT * FROM crime_incidents WHERE id = ?', (watermark,)).fetchone()
+    
+    def _max_incident_id(self, path):
+        """Highest incident id stored in one database file"""
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute('SELECT COALESCE(MAX(id), 0) FROM crime_incidents').fetchone()[0]
+        finally:
+            conn.close()
+    
+    def _incident_db_paths(self, start_date, end_date):
+        """Database files that can hold incidents between the two date strings"""
+        if self.shard_router:
+            return self.shard_router.shards_for_window(start_date, end_date)
+        return [self.db_path]
+    
+    def _query_incident_dbs(self, query, params, start_date, end_date):
+        """
+        Run a crime_incidents query against every database file that can hold
+        rows in the window (in parallel when sharded). Returns one DataFrame
+        per file; callers merge the partial results.
+        """
+        def run(path):
+            conn = sqlite3.connect(path)
+            try:
+                return pd.read_sql_query(query, conn, params=params)
+            finally:
+                conn.close()
+        
+        paths = self._incident_db_paths(start_date, end_date)
+        if not paths:
+            # No shard covers the window: the catalog's empty crime_incidents
+            # table still gives callers a correctly shaped empty result
+            paths = [self.shard_router.catalog_path]
+        if self.shard_router:
+            return self.shard_router.map(run, paths)
+        return [run(path) for path in paths]
+    
+    def _query_incidents(self, start_date, end_date, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES,
+                         columns='*'):
+        """Load incidents between two date strings that match the filters"""
+        query = f"""
+        SELECT {columns} FROM crime_incidents 
+        WHERE incident_date >= ? AND incident_date <= ?
+        """
+        params = [start_date, end_date]
+        
+        filter_clause, filter_params = build_filter_clause(neighborhood, crime_type)
+        query += filter_clause
+        params.extend(filter_params)
         
-        # Calculate date range
+        frames = self._query_incident_dbs(query, params, start_date, end_date)
+        if len(frames) == 1:
+            return frames[0]
+        non_empty = [frame for frame in frames if not frame.empty]
+        if not non_empty:
+            return frames[0]
+        return pd.concat(non_empty, ignore_index=True).sort_values('id', ignore_index=True)
+    
+    def get_date_window(self, date_range='12months'):
+        """Return (start_date, end_date) datetimes for a date range option"""
         end_date = datetime.now()
         if date_range == '3months':
             start_date = end_date - timedelta(days=90)
@@ -33,32 +325,194 @@ class CrimeDataProcessor:
             start_date = end_date - timedelta(days=365)
         else:  # 24months
             start_date = end_date - timedelta(days=730)
+        return start_date, end_date
+    
+    def get_filtered_data(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months'):
+        """
+        Get crime data based on user filter selections.
+        neighborhood and crime_type may be a single value, the "All ..." label
+        or a collection of values (e.g. {'Downtown Core', 'Old Toronto'}).
+        Returns pandas DataFrame with matching records.
+        """
+        start_date, end_date = self.get_date_window(date_range)
+        
+        df = self._query_incidents(
+            start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), neighborhood, crime_type
+        )
+        
+        if not df.empty:
+            df['incident_date'] = pd.to_datetime(df['incident_date'])
+        return df
+    
+    def get_incident_page(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months',
+                          page_size=50, after=None):
+        """
+        Get one fixed-size page of individual incidents, newest first.
+        Uses keyset (seek) pagination on (incident_date, id): pass the cursor
+        returned with the previous page as `after` to get the next page. Only
+        page_size rows are read, however large the filtered result is: the
+        date index (or, for district filters, idx_incidents_neighborhood_date)
+        already holds rows in page order, so no page sorts the whole result.
+        Returns (DataFrame, next_cursor); next_cursor is None on the last page.
+        """
+        start_date, end_date = self.get_date_window(date_range)
         
-        # Build SQL query with filters
         query = """
-        SELECT * FROM crime_incidents 
+        SELECT id, incident_date, neighborhood, crime_type, response_time_minutes, severity
+        FROM crime_incidents
         WHERE incident_date >= ? AND incident_date <= ?
         """
         params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
         
-        if neighborhood != 'All Districts':
-            query += " AND neighborhood = ?"
-            params.append(neighborhood)
+        filter_clause, filter_params = build_filter_clause(neighborhood, crime_type)
+        query += filter_clause
+        params.extend(filter_params)
         
-        if crime_type != 'All Types':
-            query += " AND crime_type = ?"
-            params.append(crime_type)
+        if after is not None:
+            query += " AND (incident_date, id) < (?, ?)"
+            params.extend(after)
         
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
+        # Fetch one extra row to find out whether another page follows
+        query += " ORDER BY incident_date DESC, id DESC LIMIT ?"
+        params.append(page_size + 1)
         
-        if not df.empty:
-            df['incident_date'] = pd.to_datetime(df['incident_date'])
-        return df
+        # Each shard returns its own first page; the newest rows overall win
+        frames = self._query_incident_dbs(query, params, params[0], params[1])
+        non_empty = [frame for frame in frames if not frame.empty]
+        if len(non_empty) > 1:
+            page = (pd.concat(non_empty, ignore_index=True)
+                    .sort_values(['incident_date', 'id'], ascending=False, ignore_index=True)
+                    .head(page_size + 1))
+        else:
+            page = non_empty[0] if non_empty else frames[0]
+        
+        next_cursor = None
+        if len(page) > page_size:
+            page = page.iloc[:page_size].copy()
+            last = page.iloc[-1]
+            next_cursor = (last['incident_date'], int(last['id']))
+        
+        if not page.empty:
+            page['incident_date'] = pd.to_datetime(page['incident_date'])
+        return page, next_cursor
+    
+    def count_filtered_rows(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months'):
+        """Count incidents matching the filters without loading them"""
+        start_date, end_date = self.get_date_window(date_range)
+        
+        query = """
+        SELECT COUNT(*) AS incidents FROM crime_incidents
+        WHERE incident_date >= ? AND incident_date <= ?
+        """
+        params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
+        
+        filter_clause, filter_params = build_filter_clause(neighborhood, crime_type)
+        query += filter_clause
+        params.extend(filter_params)
+        
+        frames = self._query_incident_dbs(query, params, params[0], params[1])
+        return int(sum(frame['incidents'].sum() for frame in frames))
+    
+    def iter_filtered_chunks(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months',
+                             chunk_size=10000):
+        """
+        Yield the incidents matching the filters as DataFrames of at most
+        chunk_size rows, oldest first. Rows are pulled from the cursor one
+        chunk at a time, so memory use does not grow with the result size.
+        """
+        start_date, end_date = self.get_date_window(date_range)
+        
+        query = f"""
+        SELECT {', '.join(EXPORT_COLUMNS)} FROM crime_incidents
+        WHERE incident_date >= ? AND incident_date <= ?
+        """
+        params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
+        
+        filter_clause, filter_params = build_filter_clause(neighborhood, crime_type)
+        query += filter_clause + " ORDER BY incident_date, id"
+        params.extend(filter_params)
+        
+        # Shards are visited oldest first, so the overall order is preserved
+        for path in self._incident_db_paths(params[0], params[1]):
+            conn = sqlite3.connect(path)
+            try:
+                for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunk_size):
+                    yield chunk
+            finally:
+                conn.close()
+    
+    def export_filtered_data(self, output, file_format='csv', neighborhood=ALL_NEIGHBORHOODS,
+                             crime_type=ALL_CRIME_TYPES, date_range='12months', chunk_size=10000,
+                             progress_callback=None):
+        """
+        Stream the incidents matching the filters to a CSV or Parquet file.
+        output is a file path or an open file object (text for CSV, binary
+        for Parquet). progress_callback, if given, is called after every
+        chunk with (rows_written, total_rows). Returns the number of rows written.
+        Parquet export needs the optional pyarrow package.
+        """
+        if file_format not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported export format: {file_format}")
+        
+        total_rows = self.count_filtered_rows(neighborhood, crime_type, date_range)
+        chunks = self.iter_filtered_chunks(neighborhood, crime_type, date_range, chunk_size)
+        
+        if file_format == 'csv':
+            rows_written = self._write_csv_chunks(output, chunks, total_rows, progress_callback)
+        else:
+            rows_written = self._write_parquet_chunks(output, chunks, total_rows, progress_callback)
+        return rows_written
     
-    def get_neighborhood_comparison(self, crime_type='All Types', date_range='12months'):
+    def _write_csv_chunks(self, output, chunks, total_rows, progress_callback):
+        """Append each chunk to a CSV file, writing the header once"""
+        handle = open(output, 'w', newline='') if isinstance(output, str) else output
+        rows_written = 0
+        try:
+            pd.DataFrame(columns=EXPORT_COLUMNS).to_csv(handle, index=False)
+            for chunk in chunks:
+                chunk.to_csv(handle, header=False, index=False)
+                rows_written += len(chunk)
+                if progress_callback:
+                    progress_callback(rows_written, total_rows)
+        finally:
+            if isinstance(output, str):
+                handle.close()
+        return rows_written
+    
+    def _write_parquet_chunks(self, output, chunks, total_rows, progress_callback):
+        """Write each chunk as a Parquet row group with a fixed schema"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+        
+        # A fixed schema keeps every row group consistent, even for chunks
+        # where a column happens to be entirely NULL
+        schema = pa.schema([
+            ('id', pa.int64()),
+            ('incident_date', pa.date32()),
+            ('neighborhood', pa.string()),
+            ('crime_type', pa.string()),
+            ('response_time_minutes', pa.float64()),
+            ('severity', pa.string()),
+            ('latitude', pa.float64()),
+            ('longitude', pa.float64()),
+        ])
+        
+        rows_written = 0
+        with pq.ParquetWriter(output, schema) as writer:
+            for chunk in chunks:
+                chunk['incident_date'] = pd.to_datetime(chunk['incident_date']).dt.date
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows_written += len(chunk)
+                if progress_callback:
+                    progress_callback(rows_written, total_rows)
+        return rows_written
+    
+    def get_neighborhood_comparison(self, crime_type=ALL_CRIME_TYPES, date_range='12months'):
         """Compare crime statistics across neighborhoods"""
-        df = self.get_filtered_data('All Districts', crime_type, date_range)
+        df = self.get_filtered_data(ALL_NEIGHBORHOODS, crime_type, date_range)
         
         if df.empty:
             return pd.DataFrame(columns=['neighborhood', 'incidents', 'avg_response_time', 'risk_level'])
@@ -81,53 +535,476 @@ class CrimeDataProcessor:
         
         return comparison
     
-    def get_monthly_trends(self, neighborhood='All Districts', crime_type='All Types', date_range='12months'):
+    def _rollups_available(self):
+        """Check once whether the daily_rollups table exists"""
+        if self._has_rollups is None:
+            conn = self.get_connection()
+            self._has_rollups = self._table_exists(conn, 'daily_rollups')
+            conn.close()
+        return self._has_rollups
+    
+    def _grouped_totals(self, group_expr, start_date, end_date, neighborhood=ALL_NEIGHBORHOODS,
+                        crime_type=ALL_CRIME_TYPES):
+        """
+        Incident count and response time totals grouped by a SQL expression,
+        between two date strings. Reads daily_rollups when available, so the
+        cost depends on days x neighborhoods x crime types rather than on the
+        number of incidents. Returns a DataFrame indexed by group.
+        """
+        if self._rollups_available():
+            query = f"""
+            SELECT {group_expr} AS grp,
+                   SUM(incidents) AS incidents,
+                   SUM(response_sum) AS response_sum,
+                   SUM(response_count) AS response_count
+            FROM daily_rollups
+            WHERE incident_date >= ? AND incident_date <= ?
+            """
+        else:
+            query = f"""
+            SELECT {group_expr} AS grp,
+                   COUNT(*) AS incidents,
+                   COALESCE(SUM(response_time_minutes), 0) AS response_sum,
+                   COUNT(response_time_minutes) AS response_count
+            FROM crime_incidents
+            WHERE incident_date >= ? AND incident_date <= ?
+            """
+        params = [start_date, end_date]
+        
+        filter_clause, filter_params = build_filter_clause(neighborhood, crime_type)
+        query += filter_clause + " GROUP BY grp"
+        params.extend(filter_params)
+        
+        frames = self._query_incident_dbs(query, params, start_date, end_date)
+        totals = pd.concat(frames, ignore_index=True).groupby('grp').sum()
+        return totals[totals['incidents'] > 0]
+    
+    def get_incident_trends(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months',
+                            granularity='month'):
+        """
+        Get incident counts per time bucket. granularity is one of 'day',
+        'week', 'month' or 'quarter'; bucketing happens in the query.
+        Returns a DataFrame with 'period' and 'incidents' columns.
+        """
+        start_date, end_date = self.get_date_window(date_range)
+        return self._incident_trends_between(
+            start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), neighborhood, crime_type, granularity
+        )
+    
+    def _incident_trends_between(self, start_date, end_date, neighborhood, crime_type, granularity):
+        """Incident counts per time bucket between two date strings"""
+        if granularity not in TIME_BUCKETS:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        totals = self._grouped_totals(TIME_BUCKETS[granularity], start_date, end_date, neighborhood, crime_type)
+        return totals['incidents'].astype(int).rename_axis('period').reset_index()
+    
+    def downsample_series(self, series, x='period', y='incidents', max_points=500, method='lttb'):
+        """
+        Reduce a time series DataFrame to at most max_points rows for charting.
+        method='lttb' keeps the visual shape (Largest-Triangle-Three-Buckets);
+        method='minmax' keeps each bucket's minimum and maximum so no spike is lost.
+        """
+        if len(series) <= max_points:
+            return series
+        if method == 'lttb':
+            # Quarter labels aren't dates; buckets are evenly spaced anyway
+            positions = pd.to_datetime(series[x], errors='coerce')
+            x_values = positions.astype('int64') if positions.notna().all() else np.arange(len(series))
+            keep = lttb_indices(x_values, series[y], max_points)
+        elif method == 'minmax':
+            keep = minmax_indices(series[y], max_points)
+        else:
+            raise ValueError(f"Unsupported downsampling method: {method}")
+        return series.iloc[keep].reset_index(drop=True)
+    
+    def get_chart_trends(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months',
+                         granularity='day', max_points=500, method='lttb', zoom=None):
+        """
+        Incident trend series capped at max_points for the browser.
+        zoom=(start_date, end_date) refetches just that window from the
+        database, so a narrow window is shown at full resolution and only
+        wide windows are downsampled.
+        Returns (series, downsampled) where downsampled says whether points were dropped.
+        """
+        if zoom is not None:
+            series = self._incident_trends_between(zoom[0], zoom[1], neighborhood, crime_type, granularity)
+        else:
+            series = self.get_incident_trends(neighborhood, crime_type, date_range, granularity)
+        reduced = self.downsample_series(series, max_points=max_points, method=method)
+        return reduced, len(reduced) < len(series)
+    
+    def get_response_time_trends(self, neighborhood=ALL_NEIGHBORHOODS, date_range='12months', granularity='month'):
+        """
+        Get the mean response time per time bucket (see get_incident_trends).
+        Buckets whose incidents have no recorded response time get NaN.
+        Returns a DataFrame with 'period' and 'response_time_minutes' columns.
+        """
+        if granularity not in TIME_BUCKETS:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        start_date, end_date = self.get_date_window(date_range)
+        
+        totals = self._grouped_totals(
+            TIME_BUCKETS[granularity], start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'),
+            neighborhood, ALL_CRIME_TYPES
+        )
+        response = (
+            totals['response_sum'] / totals['response_count'].where(totals['response_count'] > 0)
+        ).round(1)
+        return response.rename('response_time_minutes').rename_axis('period').reset_index()
+    
+    def get_monthly_trends(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months'):
         """Get monthly crime trends over time"""
-        df = self.get_filtered_data(neighborhood, crime_type, date_range)
+        trends = self.get_incident_trends(neighborhood, crime_type, date_range, 'month')
+        return trends.rename(columns={'period': 'year_month'})
+    
+    def _table_exists(self, conn, table_name):
+        """Check whether a table exists in the database"""
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).fetchone()
+        return row is not None
+    
+    def _config_source(self, conn, table_name, columns, defaults):
+        """
+        SQL for a config table, or an equivalent VALUES list built from the
+        defaults when the database predates that table. Returns (sql, params).
+        """
+        if self._table_exists(conn, table_name):
+            return f"SELECT {', '.join(columns)} FROM {table_name}", []
+        row_sql = f"({', '.join('?' * len(columns))})"
+        params = [value for row in defaults for value in row]
+        return "VALUES " + ", ".join([row_sql] * len(defaults)), params
+    
+    def get_risk_thresholds(self):
+        """Get the risk tier thresholds used by the neighborhood classification"""
+        conn = self.get_connection()
+        source, params = self._config_source(
+            conn, 'risk_thresholds', ['metric', 'tier', 'min_value'], DEFAULT_RISK_THRESHOLDS
+        )
+        thresholds = pd.read_sql_query(source, conn, params=params)
+        conn.close()
+        thresholds.columns = ['metric', 'tier', 'min_value']
+        return thresholds.sort_values(['metric', 'min_value']).reset_index(drop=True)
+    
+    def get_neighborhood_risk_classification(self, crime_type=ALL_CRIME_TYPES, date_range='12months'):
+        """
+        Classify every neighborhood by annualized incidents per 100k residents
+        and per km², using the neighborhoods table and the risk_thresholds
+        config table. Per-neighborhood counts come from daily_rollups when
+        available (one partial per shard when sharded), then rates, risk tiers
+        and priority tiers are computed in a single SQL pass, so it scales
+        with the number of neighborhoods without any Python row loops.
+        """
+        start_date, end_date = self.get_date_window(date_range)
+        # Annualize so the same thresholds work for every date range
+        annualize = 365.0 / max((end_date - start_date).days, 1)
+        counts = self._grouped_totals(
+            'neighborhood', start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'),
+            ALL_NEIGHBORHOODS, crime_type
+        ).rename_axis('neighborhood').reset_index()
         
-        if df.empty:
-            return pd.DataFrame(columns=['year_month', 'incidents'])
+        conn = self.get_connection()
+        conn.execute("""
+        CREATE TEMP TABLE incident_counts (
+            neighborhood TEXT, incidents INTEGER, response_sum REAL, response_count INTEGER
+        )
+        """)
+        conn.executemany(
+            "INSERT INTO incident_counts VALUES (?, ?, ?, ?)",
+            zip(counts['neighborhood'].tolist(), counts['incidents'].tolist(),
+                counts['response_sum'].tolist(), counts['response_count'].tolist())
+        )
+        thresholds_sql, thresholds_params = self._config_source(
+            conn, 'risk_thresholds', ['metric', 'tier', 'min_value'], DEFAULT_RISK_THRESHOLDS
+        )
         
-        df['year_month'] = df['incident_date'].dt.to_period('M')
-        monthly_trends = df.groupby('year_month').size().reset_index(name='incidents')
-        monthly_trends['year_month'] = monthly_trends['year_month'].astype(str)
+        query = f"""
+        WITH thresholds(metric, tier, min_value) AS ({thresholds_sql}),
+        counts AS (
+            SELECT neighborhood,
+                   incidents,
+                   response_sum / response_count AS avg_response_time
+            FROM temp.incident_counts
+        ),
+        rates AS (
+            SELECT n.name AS neighborhood,
+                   COALESCE(c.incidents, 0) AS incidents,
+                   c.avg_response_time,
+                   n.population,
+                   n.area_km2,
+                   COALESCE(c.incidents, 0) * ? * 100000.0 / n.population AS incidents_per_100k,
+                   COALESCE(c.incidents, 0) * ? / n.area_km2 AS incidents_per_km2
+            FROM neighborhoods n
+            LEFT JOIN counts c ON c.neighborhood = n.name
+        ),
+        tiers AS (
+            SELECT r.*,
+                   (SELECT t.tier FROM thresholds t
+                    WHERE t.metric = 'incidents_per_100k' AND r.incidents_per_100k >= t.min_value
+                    ORDER BY t.min_value DESC LIMIT 1) AS risk_level,
+                   (SELECT t.tier FROM thresholds t
+                    WHERE t.metric = 'incidents_per_km2' AND r.incidents_per_km2 >= t.min_value
+                    ORDER BY t.min_value DESC LIMIT 1) AS density_level
+            FROM rates r
+        )
+        SELECT *,
+               CASE
+                   WHEN risk_level = 'High' OR density_level = 'High' THEN 'High Priority'
+                   WHEN risk_level = 'Medium' OR density_level = 'Medium' THEN 'Medium Priority'
+                   ELSE 'Standard Priority'
+               END AS priority
+        FROM tiers
+        ORDER BY incidents_per_100k DESC, neighborhood
+        """
+        params = thresholds_params + [annualize, annualize]
+        
+        classification = pd.read_sql_query(query, conn, params=params)
+        conn.close()
         
-        return monthly_trends
+        classification[['avg_response_time', 'incidents_per_100k', 'incidents_per_km2']] = \
+            classification[['avg_response_time', 'incidents_per_100k', 'incidents_per_km2']].round(1)
+        return classification
+    
+    def get_crime_type_priorities(self):
+        """Get the priority tier for each crime type from the config table"""
+        conn = self.get_connection()
+        source, params = self._config_source(
+            conn, 'crime_type_priorities', ['crime_type', 'priority'], DEFAULT_CRIME_TYPE_PRIORITIES
+        )
+        priorities = pd.read_sql_query(source, conn, params=params)
+        conn.close()
+        priorities.columns = ['crime_type', 'priority']
+        return priorities
     
-    def get_crime_type_distribution(self, neighborhood='All Districts', date_range='12months'):
-        """Get breakdown of crime types by percentage"""
-        df = self.get_filtered_data(neighborhood, 'All Types', date_range)
+    def get_crime_type_distribution(self, neighborhood=ALL_NEIGHBORHOODS, date_range='12months'):
+        """Get breakdown of crime types by percentage (from the rollups when available)"""
+        start_date, end_date = self.get_date_window(date_range)
+        totals = self._grouped_totals(
+            'crime_type', start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), neighborhood
+        )
         
-        if df.empty:
-            return pd.DataFrame(columns=['crime_type', 'count', 'percentage'])
+        if totals.empty:
+            return pd.DataFrame(columns=['crime_type', 'count', 'percentage', 'priority'])
         
-        distribution = df['crime_type'].value_counts().reset_index()
-        distribution.columns = ['crime_type', 'count']
+        distribution = (totals['incidents'].astype(int).sort_values(ascending=False, kind='stable')
+                        .rename('count').rename_axis('crime_type').reset_index())
         distribution['percentage'] = (distribution['count'] / distribution['count'].sum() * 100).round(1)
         
+        # Attach priority tiers from the config table; unlisted types are standard
+        distribution = distribution.merge(self.get_crime_type_priorities(), on='crime_type', how='left')
+        distribution['priority'] = distribution['priority'].fillna('Standard Priority')
+        
         return distribution
     
-    def get_response_time_analysis(self, neighborhood='All Districts', date_range='12months'):
-        """Analyze emergency response times by month and neighborhood"""
-        df = self.get_filtered_data(neighborhood, 'All Types', date_range)
-        
-        if df.empty:
-            return pd.DataFrame(columns=['year_month', 'response_time_minutes']), pd.DataFrame(columns=['neighborhood', 'response_time_minutes', 'target'])
-        
+    def get_crime_matrix(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months'):
+        """
+        Neighborhood x crime type cross-tab for the current period: incident
+        count, mean response time and change versus the previous period of
+        the same length. Both periods come from one GROUP BY over the rollups
+        (or incidents), split with CASE, so the cost doesn't depend on how
+        many cells the matrix has.
+        Returns a long DataFrame with one row per neighborhood and crime type.
+        """
+        start_date, end_date = self.get_date_window(date_range)
+        prev_days = (end_date - start_date).days
+        prev_end = end_date - timedelta(days=prev_days)
+        prev_start = prev_end - timedelta(days=prev_days)
+        current_start = start_date.strftime('%Y-%m-%d')
+        window = (prev_start.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+
+        if self._rollups_available():
+            source, count, response_sum, response_count = 'daily_rollups', 'incidents', 'response_sum', 'response_count'
+        else:
+            source, count = 'crime_incidents', '1'
+            response_sum = 'COALESCE(response_time_minutes, 0)'
+            response_count = '(response_time_minutes IS NOT NULL)'
+
+        # The periods share their boundary day, as in get_safety_metrics
+        query = f"""
+        SELECT neighborhood, crime_type,
+               SUM(CASE WHEN incident_date >= ? THEN {count} ELSE 0 END) AS incidents,
+               SUM(CASE WHEN incident_date >= ? THEN {response_sum} ELSE 0 END) AS response_sum,
+               SUM(CASE WHEN incident_date >= ? THEN {response_count} ELSE 0 END) AS response_count,
+               SUM(CASE WHEN incident_date <= ? THEN {count} ELSE 0 END) AS prev_incidents
+        FROM {source}
+        WHERE incident_date >= ? AND incident_date <= ?
+        """
+        params = [current_start] * 3 + [prev_end.strftime('%Y-%m-%d'), window[0], window[1]]
+
+        filter_clause, filter_params = build_filter_clause(neighborhood, crime_type)
+        query += filter_clause + " GROUP BY neighborhood, crime_type"
+        params.extend(filter_params)
+
+        # Shards hold disjoint days, so their partial sums simply add up
+        frames = self._query_incident_dbs(query, params, window[0], window[1])
+        matrix = pd.concat(frames, ignore_index=True).groupby(['neighborhood', 'crime_type']).sum()
+        matrix = matrix[(matrix['incidents'] > 0) | (matrix['prev_incidents'] > 0)].reset_index()
+
+        matrix['incidents'] = matrix['incidents'].astype(int)
+        matrix['prev_incidents'] = matrix['prev_incidents'].astype(int)
+        matrix['avg_response_time'] = (
+            matrix['response_sum'] / matrix['response_count'].where(matrix['response_count'] > 0)
+        ).round(1)
+        matrix['change'] = matrix['incidents'] - matrix['prev_incidents']
+        matrix['change_percent'] = (
+            matrix['change'] / matrix['prev_incidents'].where(matrix['prev_incidents'] > 0) * 100
+        ).fillna(0).round(1)
+
+        return matrix[['neighborhood', 'crime_type', 'incidents', 'avg_response_time',
+                       'prev_incidents', 'change', 'change_percent']]
+
+    def get_response_time_analysis(self, neighborhood=ALL_NEIGHBORHOODS, date_range='12months'):
+        """
+        Analyze emergency response times by month and neighborhood. Months
+        and neighborhoods without a recorded response time get NaN.
+        """
         # Monthly response times
-        df['year_month'] = df['incident_date'].dt.to_period('M')
-        monthly_response = df.groupby('year_month')['response_time_minutes'].mean().reset_index()
-        monthly_response['year_month'] = monthly_response['year_month'].astype(str)
-        monthly_response['response_time_minutes'] = monthly_response['response_time_minutes'].round(1)
+        monthly_response = self.get_response_time_trends(neighborhood, date_range, 'month')
+        monthly_response = monthly_response.rename(columns={'period': 'year_month'})
         
         # Response times by neighborhood
-        neighborhood_response = df.groupby('neighborhood')['response_time_minutes'].mean().reset_index()
-        neighborhood_response['response_time_minutes'] = neighborhood_response['response_time_minutes'].round(1)
+        start_date, end_date = self.get_date_window(date_range)
+        totals = self._grouped_totals(
+            'neighborhood', start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), neighborhood
+        )
+        neighborhood_response = (
+            totals['response_sum'] / totals['response_count'].where(totals['response_count'] > 0)
+        ).round(1).rename('response_time_minutes').rename_axis('neighborhood').reset_index()
         neighborhood_response['target'] = 8.0  # 8-minute target
         
         return monthly_response, neighborhood_response
     
-    def get_safety_metrics(self, neighborhood='All Districts', crime_type='All Types', date_range='12months'):
+    def _daily_totals(self, start_date, end_date, neighborhood, crime_type, after_id=None, up_to_id=None):
+        """
+        Incident count and response time totals per day between two date
+        strings, optionally limited to incidents with after_id < id <= up_to_id.
+        A delta (after_id above 0) skips the indexes, so SQLite seeks on the
+        id range instead of walking the whole date window.
+        """
+        query = f"""
+        SELECT incident_date,
+               COUNT(*) AS incidents,
+               COALESCE(SUM(response_time_minutes), 0) AS response_sum,
+               COUNT(response_time_minutes) AS response_count
+        FROM crime_incidents{' NOT INDEXED' if after_id else ''}
+        WHERE incident_date >= ? AND incident_date <= ?
+        """
+        params = [start_date, end_date]
+        
+        filter_clause, filter_params = build_filter_clause(neighborhood, crime_type)
+        query += filter_clause
+        params.extend(filter_params)
+        
+        if after_id is not None:
+            query += " AND id > ? AND id <= ?"
+            params.extend([after_id, up_to_id])
+        query += " GROUP BY incident_date"
+        
+        frames = self._query_incident_dbs(query, params, start_date, end_date)
+        return pd.concat(frames, ignore_index=True).groupby('incident_date').sum()
+    
+    def get_live_snapshot(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months'):
+        """
+        Monthly trend and KPI metrics for the filters, maintained incrementally.
+        The first call aggregates the current and previous periods by day;
+        later calls only fold in incidents above the cached ingest watermark,
+        so just the days (and months) they touch change. A rewritten database
+        (a new generation, see get_data_version) is aggregated again.
+        Returns (monthly_trends, metrics) matching get_monthly_trends and
+        get_safety_metrics.
+        """
+        start_date, end_date = self.get_date_window(date_range)
+        prev_days = (end_date - start_date).days
+        prev_end = end_date - timedelta(days=prev_days)
+        prev_start = prev_end - timedelta(days=prev_days)
+        
+        current = (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        previous = (prev_start.strftime('%Y-%m-%d'), prev_end.strftime('%Y-%m-%d'))
+        key = (normalize_selection(neighborhood, ALL_NEIGHBORHOODS),
+               normalize_selection(crime_type, ALL_CRIME_TYPES), previous[0], current[1])
+        generation, watermark = self.get_data_version()
+        
+        # The shared lock only guards the cache itself; each entry has its own
+        # lock, so sessions with other filters don't wait for this aggregation
+        with self._live_lock:
+            state = self._live_cache.get(key)
+            if state is None:
+                state = {'lock': threading.Lock(), 'daily': None, 'generation': None, 'watermark': 0}
+                self._live_cache[key] = state
+            self._live_cache.move_to_end(key)
+            while len(self._live_cache) > self.LIVE_CACHE_SIZE:
+                self._live_cache.popitem(last=False)
+        
+        with state['lock']:
+            if state['daily'] is None or state['generation'] != generation:
+                # Bounded by the watermark so rows committed meanwhile are
+                # picked up by the next delta rather than counted twice
+                state['daily'] = self._daily_totals(previous[0], current[1], neighborhood, crime_type,
+                                                    after_id=0, up_to_id=watermark)
+                state['generation'], state['watermark'] = generation, watermark
+            elif watermark > state['watermark']:
+                delta = self._daily_totals(previous[0], current[1], neighborhood, crime_type,
+                                           after_id=state['watermark'], up_to_id=watermark)
+                state['daily'] = state['daily'].add(delta, fill_value=0)
+                state['watermark'] = watermark
+            daily = state['daily']
+        
+        # The two periods share their boundary day, as in get_safety_metrics
+        current_days = daily[(daily.index >= current[0]) & (daily.index <= current[1])]
+        previous_days = daily[(daily.index >= previous[0]) & (daily.index <= previous[1])]
+        
+        current_days = current_days[current_days['incidents'] > 0]
+        monthly_trends = (current_days.groupby(current_days.index.str[:7])['incidents'].sum()
+                          .rename_axis('year_month').reset_index())
+        monthly_trends['incidents'] = monthly_trends['incidents'].astype(int)
+        
+        classification = self.get_neighborhood_risk_classification(crime_type, date_range)
+        metrics = self._summarize_metrics(
+            int(current_days['incidents'].sum()),
+            int(previous_days['incidents'].sum()),
+            (current_days['response_sum'].sum(), current_days['response_count'].sum()),
+            (previous_days['response_sum'].sum(), previous_days['response_count'].sum()),
+            int((classification['priority'] == 'High Priority').sum())
+        )
+        return monthly_trends, metrics
+    
+    def _mean_response(self, incidents, response_totals):
+        """
+        Mean of the recorded response times from (sum, count) totals: 0 for
+        a period without incidents, NaN when none of its incidents has a
+        response time recorded.
+        """
+        response_sum, response_count = response_totals
+        if incidents == 0:
+            return 0
+        return response_sum / response_count if response_count > 0 else float('nan')
+    
+    def _summarize_metrics(self, total_incidents, prev_incidents, response_totals, prev_response_totals,
+                           high_risk_areas):
+        """
+        Turn current/previous period totals into the KPI dictionary. Response
+        times arrive as (sum, count) totals, so every caller applies the same
+        missing-value rule (see _mean_response).
+        """
+        avg_response_time = self._mean_response(total_incidents, response_totals)
+        prev_response_time = self._mean_response(prev_incidents, prev_response_totals)
+        change_percent = ((total_incidents - prev_incidents) / max(prev_incidents, 1) * 100) if prev_incidents > 0 else 0
+        response_change = ((avg_response_time - prev_response_time) / max(prev_response_time, 1) * 100) if prev_response_time > 0 else 0
+        
+        # Safety score calculation (0-10 scale); 0 when no response time was recorded
+        safety_score = 0 if np.isnan(avg_response_time) else max(0, 10 - (total_incidents / 100) - (avg_response_time / 2))
+        safety_score = min(10, safety_score)
+        
+        return {
+            'total_incidents': total_incidents,
+            'change_percent': round(change_percent, 1),
+            'avg_response_time': round(avg_response_time, 1),
+            'response_change': round(response_change, 1),
+            'high_risk_areas': high_risk_areas,
+            'safety_score': round(safety_score, 1)
+        }
+    
+    def get_safety_metrics(self, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES, date_range='12months'):
         """Calculate key performance indicators for the dashboard"""
         current_df = self.get_filtered_data(neighborhood, crime_type, date_range)
         
@@ -145,44 +1022,112 @@ class CrimeDataProcessor:
         end_date = datetime.now() - timedelta(days=prev_days)
         start_date = end_date - timedelta(days=prev_days)
         
-        conn = self.get_connection()
-        prev_query = """
-        SELECT * FROM crime_incidents 
-        WHERE incident_date >= ? AND incident_date <= ?
-        """
-        prev_params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        
-        if neighborhood != 'All Districts':
-            prev_query += " AND neighborhood = ?"
-            prev_params.append(neighborhood)
-        
-        if crime_type != 'All Types':
-            prev_query += " AND crime_type = ?"
-            prev_params.append(crime_type)
-        
-        prev_df = pd.read_sql_query(prev_query, conn, params=prev_params)
-        conn.close()
+        prev_df = self._query_incidents(
+            start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), neighborhood, crime_type
+        )
         
-        # Calculate metrics
-        total_incidents = len(current_df)
-        prev_incidents = len(prev_df)
-        change_percent = ((total_incidents - prev_incidents) / max(prev_incidents, 1) * 100) if prev_incidents > 0 else 0
+        # High Priority on either rate (per 100k residents or per km²), as on the District tab
+        classification = self.get_neighborhood_risk_classification(crime_type, date_range)
+        high_risk_areas = int((classification['priority'] == 'High Priority').sum())
         
-        avg_response_time = current_df['response_time_minutes'].mean() if len(current_df) > 0 else 0
-        prev_response_time = prev_df['response_time_minutes'].mean() if len(prev_df) > 0 else 0
-        response_change = ((avg_response_time - prev_response_time) / max(prev_response_time, 1) * 100) if prev_response_time > 0 else 0
+        response_times = current_df['response_time_minutes']
+        prev_response_times = prev_df['response_time_minutes']
+        return self._summarize_metrics(
+            len(current_df), len(prev_df),
+            (response_times.sum(), response_times.count()),
+            (prev_response_times.sum(), prev_response_times.count()),
+            high_risk_areas
+        )
+    
+    def _series_day_counts(self, start_date, end_date, after_id, up_to_id):
+        """
+        Incidents per day, neighborhood and crime type with after_id < id <= up_to_id
+        (a delta seeks on the id range, as in _daily_totals)
+        """
+        query = f"""
+        SELECT incident_date, neighborhood, crime_type, COUNT(*) AS incidents
+        FROM crime_incidents{' NOT INDEXED' if after_id else ''}
+        WHERE incident_date >= ? AND incident_date <= ? AND id > ? AND id <= ?
+        GROUP BY incident_date, neighborhood, crime_type
+        """
+        frames = self._query_incident_dbs(query, [start_date, end_date, after_id, up_to_id], start_date, end_date)
+        return pd.concat(frames, ignore_index=True)
+    
+    def _fold_series_counts(self, state, counts):
+        """Add per-day series counts into the anomaly state's 2-D array"""
+        if counts.empty:
+            return
+        keys = pd.MultiIndex.from_frame(counts[['neighborhood', 'crime_type']])
+        new_keys = keys.unique().difference(state['series'])
+        if len(new_keys):
+            state['series'] = state['series'].append(new_keys)
+            state['counts'] = np.vstack([state['counts'], np.zeros((len(new_keys), state['counts'].shape[1]), dtype=int)])
+        rows = state['series'].get_indexer(keys)
+        days = counts['incident_date'].str[:10].to_numpy().astype('datetime64[D]')
+        cols = (days - state['start']).astype(int)
+        np.add.at(state['counts'], (rows, cols), counts['incidents'].to_numpy())
+    
+    def _anomaly_counts(self, days):
+        """
+        Daily incident counts for every neighborhood x crime type series as a
+        (series x days) array covering the baseline weeks plus `days` scored
+        days up to today. The array is kept between calls: new incidents
+        (above the ingest watermark) are added in place and new days are
+        appended as they arrive; a rewritten database starts over.
+        Returns (series, start, counts).
+        """
+        end = np.datetime64(datetime.now().date(), 'D')
+        start = end - (7 * ANOMALY_BASELINE_WEEKS + days - 1)
+        generation, watermark = self.get_data_version()
         
-        high_risk_areas = len(self.get_neighborhood_comparison(crime_type, date_range).query('risk_level == "High"'))
+        with self._anomaly_lock:
+            state = self._anomaly_state
+            if state is None or start < state['start'] or generation != state['generation']:
+                state = {
+                    'series': pd.MultiIndex.from_tuples([], names=['neighborhood', 'crime_type']),
+                    'start': start,
+                    'counts': np.zeros((0, (end - start).astype(int) + 1), dtype=int),
+                    'generation': generation,
+                    'watermark': watermark
+                }
+                self._fold_series_counts(state, self._series_day_counts(str(start), str(end), 0, watermark))
+                self._anomaly_state = state
+            else:
+                # Slide the window: drop days before start, append new days
+                state['counts'] = state['counts'][:, (start - state['start']).astype(int):]
+                state['start'] = start
+                missing_days = (end - start).astype(int) + 1 - state['counts'].shape[1]
+                if missing_days > 0:
+                    state['counts'] = np.hstack([state['counts'], np.zeros((len(state['series']), missing_days), dtype=int)])
+                if watermark > state['watermark']:
+                    self._fold_series_counts(
+                        state, self._series_day_counts(str(start), str(end), state['watermark'], watermark)
+                    )
+                    state['watermark'] = watermark
+            return state['series'], state['start'], state['counts'].copy()
+    
+    def get_anomalies(self, days=30, z_threshold=3.0, min_incidents=3, limit=20):
+        """
+        Find unusual daily spikes across every neighborhood x crime type
+        series over the last `days` days. All series are scored together
+        against their weekday baselines (see seasonal_zscores); a spike needs
+        a z-score of at least z_threshold and at least min_incidents incidents.
+        Returns the top `limit` spikes city-wide, highest z-score first.
+        """
+        series, start, counts = self._anomaly_counts(days)
+        baseline, zscores = seasonal_zscores(counts, ANOMALY_BASELINE_WEEKS)
+        scored = counts[:, -days:]
         
-        # Safety score calculation (0-10 scale)
-        safety_score = max(0, 10 - (total_incidents / 100) - (avg_response_time / 2))
-        safety_score = min(10, safety_score)
+        rows, cols = np.nonzero((zscores >= z_threshold) & (scored >= min_incidents))
+        order = np.argsort(-zscores[rows, cols], kind='stable')[:limit]
+        rows, cols = rows[order], cols[order]
         
-        return {
-            'total_incidents': total_incidents,
-            'change_percent': round(change_percent, 1),
-            'avg_response_time': round(avg_response_time, 1),
-            'response_change': round(response_change, 1),
-            'high_risk_areas': high_risk_areas,
-            'safety_score': round(safety_score, 1)
-        }
+        anomalies = pd.DataFrame({
+            'incident_date': (start + 7 * ANOMALY_BASELINE_WEEKS + cols).astype(str),
+            'neighborhood': series.get_level_values('neighborhood')[rows],
+            'crime_type': series.get_level_values('crime_type')[rows],
+            'incidents': scored[rows, cols],
+            'baseline': baseline[rows, cols].round(1),
+            'z_score': zscores[rows, cols].round(1)
+        })
+        return anomalies
@@ -0,0 +1,25 @@
+"""
+Filter labels and selection handling shared by the dashboard and the data layer.
+
+Kept free of heavy imports so the dashboard can draw its filter controls
+before pandas and the data processor have loaded.
+"""
+
+ALL_NEIGHBORHOODS = 'All Districts'
+ALL_CRIME_TYPES = 'All Types'
+
+
+def normalize_selection(selection, all_label):
+    """
+    Turn a filter selection into a sorted tuple of values, or None for "all".
+    Accepts a single value, the "All ..." label, or any iterable of values.
+    An empty selection means no filter, like the "All ..." label.
+    """
+    if selection is None:
+        return None
+    if isinstance(selection, str):
+        return None if selection == all_label else (selection,)
+    values = tuple(sorted(set(selection)))
+    if not values or all_label in values:
+        return None
+    return values
@@ -0,0 +1,395 @@
+"""
+Live incident ingestion for the Toronto Public Safety Dashboard.
+
+Incidents arrive as JSON objects through a local TCP socket (one object per
+line) or as .json/.jsonl/.csv files dropped into a watched directory. All of
+them go through one queue to a single writer thread, which appends them to
+crime_incidents in batches and updates the daily_rollups table in the same
+transaction. The database runs in WAL mode, so dashboard readers never wait
+for the writer.
+"""
+
+import csv
+import json
+import logging
+import os
+import queue
+import socketserver
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import date, datetime
+
+INCIDENT_FIELDS = ['incident_date', 'neighborhood', 'crime_type', 'response_time_minutes',
+                   'severity', 'latitude', 'longitude']
+REQUIRED_FIELDS = ['incident_date', 'neighborhood', 'crime_type']
+# Values a JSON or CSV field may hold; lists and objects are rejected
+SCALAR_TYPES = (str, int, float)
+
+# Same layout as scripts/setup_database.py, for ingesting into a fresh file
+INCIDENTS_DDL = '''
+CREATE TABLE IF NOT EXISTS crime_incidents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    incident_date DATE,
+    neighborhood TEXT,
+    crime_type TEXT,
+    response_time_minutes REAL,
+    severity TEXT,
+    latitude REAL,
+    longitude REAL
+)
+'''
+ROLLUPS_DDL = '''
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    incident_date DATE,
+    neighborhood TEXT,
+    crime_type TEXT,
+    incidents INTEGER,
+    response_sum REAL,
+    response_count INTEGER,
+    PRIMARY KEY (incident_date, neighborhood, crime_type)
+)
+'''
+
+ROLLUPS_BACKFILL = '''
+INSERT INTO daily_rollups
+SELECT incident_date, neighborhood, crime_type,
+       COUNT(*), COALESCE(SUM(response_time_minutes), 0), COUNT(response_time_minutes)
+FROM crime_incidents
+GROUP BY incident_date, neighborhood, crime_type
+'''
+
+# A batch that still can't be written after this many attempts is dropped
+WRITE_ATTEMPTS = 3
+WRITE_RETRY_DELAY = 0.5
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+def parse_date(value):
+    """
+    Normalize an ISO date (or ISO timestamp) to YYYY-MM-DD. The dashboard's
+    date window filters compare incident_date as text, so nothing else may
+    be stored there.
+    """
+    text = str(value).strip()
+    try:
+        parsed = date.fromisoformat(text) if len(text) <= 10 else datetime.fromisoformat(text).date()
+    except ValueError:
+        raise ValueError(f"incident_date is not an ISO date (YYYY-MM-DD): {value!r}")
+    return parsed.isoformat()
+
+
+def parse_incident(record):
+    """
+    Validate an incident dict and return it as an insert tuple. Anything
+    that can't be stored (not an object, a list or object as a field value,
+    a number that isn't one) raises ValueError.
+    """
+    if not isinstance(record, Mapping):
+        raise ValueError(f"Incident must be an object, got {type(record).__name__}")
+    missing = [field for field in REQUIRED_FIELDS if not record.get(field)]
+    if missing:
+        raise ValueError(f"Incident is missing required fields: {', '.join(missing)}")
+    for field in INCIDENT_FIELDS:
+        value = record.get(field)
+        if value is not None and not isinstance(value, SCALAR_TYPES):
+            raise ValueError(f"Incident field {field} must be a single value, got {type(value).__name__}")
+
+    def text(field):
+        value = record.get(field)
+        return str(value) if value not in (None, '') else None
+
+    def number(field):
+        value = record.get(field)
+        if value in (None, ''):
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"Incident field {field} is not a number: {value!r}")
+
+    return (
+        parse_date(record['incident_date']),
+        text('neighborhood'),
+        text('crime_type'),
+        number('response_time_minutes'),
+        text('severity'),
+        number('latitude'),
+        number('longitude'),
+    )
+
+
+class IncidentIngestService:
+    """
+    Append-only incident writer. Call start(), feed incidents with submit()
+    (or serve_socket() / watch_directory()), and stop() to flush and shut down.
+    Listeners registered with add_listener() are called after every committed
+    batch with (first_id, last_id, rows) so caches can update incrementally.
+    A batch that keeps failing (e.g. the database stays locked) is logged,
+    counted in failed_rows and dropped; a batch that fails for any other
+    reason is written again row by row, so only the rows that can't be
+    stored are dropped. The writer keeps running either way.
+    """
+
+    def __init__(self, db_path='toronto_crime.db', batch_size=500, flush_interval=0.25):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.listeners = []
+        self.rows_written = 0
+        self.batches_written = 0
+        self.rejected = 0
+        self.failed_rows = 0
+        self.failed_files = 0
+        self._writer = None
+        self._background = []
+        self._stopping = threading.Event()
+
+    def add_listener(self, callback):
+        """Register callback(first_id, last_id, rows) for committed batches"""
+        self.listeners.append(callback)
+
+    def start(self):
+        """Prepare the database and start the writer thread"""
+        conn = sqlite3.connect(self.db_path)
+        # WAL is persistent: once set, every reader benefits from it
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(INCIDENTS_DDL)
+        has_rollups = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_rollups'"
+        ).fetchone()
+        if not has_rollups:
+            # Older databases: build the rollups once from existing incidents
+            conn.execute(ROLLUPS_DDL)
+            conn.execute(ROLLUPS_BACKFILL)
+        conn.commit()
+        conn.close()
+
+        self._writer = threading.Thread(target=self._writer_loop, name='incident-writer', daemon=True)
+        self._writer.start()
+        return self
+
+    def submit(self, record):
+        """Queue one incident dict for writing; raises ValueError if invalid"""
+        self.queue.put(parse_incident(record))
+
+    def submit_many(self, records):
+        """Queue several incidents, skipping invalid ones; returns how many were queued"""
+        queued = 0
+        for record in records:
+            try:
+                self.submit(record)
+                queued += 1
+            except ValueError:
+                self.rejected += 1
+        return queued
+
+    def flush(self):
+        """Block until everything queued so far has been written"""
+        self.queue.join()
+
+    def stop(self):
+        """Stop the socket/directory sources, write what is queued and stop the writer"""
+        self._stopping.set()
+        for source in self._background:
+            if isinstance(source, socketserver.BaseServer):
+                source.shutdown()
+                source.server_close()
+            else:
+                source.join()
+        if self._writer:
+            self.queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
+    def _writer_loop(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            batch = []
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+            # Gather whatever else arrives within the flush interval
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if batch:
+                try:
+                    self._write_with_retries(conn, batch)
+                except Exception as error:
+                    # e.g. a value SQLite can't bind: find the rows responsible
+                    logger.warning("Writing %d incidents failed (%s); writing them one by one", len(batch), error)
+                    self._write_rows_singly(conn, batch)
+            # flush() waits on these, so they are marked done whatever happened
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self.queue.task_done()
+        conn.close()
+
+    def _write_rows_singly(self, conn, batch):
+        """Write a failed batch one incident at a time, dropping only the rows that fail"""
+        for row in batch:
+            try:
+                self._write_with_retries(conn, [row])
+            except Exception:
+                logger.exception("Dropped an incident that could not be written: %r", row)
+                self.failed_rows += 1
+
+    def _write_with_retries(self, conn, batch):
+        """
+        Write a batch, retrying operational errors (e.g. the database is
+        locked), then notify the listeners. Other errors are raised.
+        """
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                first_id, last_id = self._write_batch(conn, batch)
+                break
+            except sqlite3.OperationalError as error:
+                # The failed transaction was rolled back, so retrying can't duplicate rows
+                logger.warning("Writing %d incidents failed (attempt %d of %d): %s",
+                               len(batch), attempt, WRITE_ATTEMPTS, error)
+                if attempt < WRITE_ATTEMPTS:
+                    time.sleep(WRITE_RETRY_DELAY * attempt)
+        else:
+            logger.error("Dropped a batch of %d incidents after %d attempts", len(batch), WRITE_ATTEMPTS)
+            self.failed_rows += len(batch)
+            return
+
+        self.rows_written += len(batch)
+        self.batches_written += 1
+        # The batch is committed; a failing listener must not stop the writer
+        for callback in self.listeners:
+            try:
+                callback(first_id, last_id, batch)
+            except Exception:
+                logger.exception("Incident listener %r failed", callback)
+
+    def _write_batch(self, conn, batch):
+        """
+        Insert a batch and fold it into daily_rollups in one transaction.
+        Returns the (first_id, last_id) the incidents got.
+        """
+        rollups = defaultdict(lambda: [0, 0.0, 0])
+        for incident_date, neighborhood, crime_type, response_time, *_ in batch:
+            totals = rollups[(incident_date, neighborhood, crime_type)]
+            totals[0] += 1
+            if response_time is not None:
+                totals[1] += response_time
+                totals[2] += 1
+
+        with conn:
+            conn.executemany(f'''
+            INSERT INTO crime_incidents ({', '.join(INCIDENT_FIELDS)})
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', batch)
+            # Only this thread writes, so the batch got consecutive ids
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            conn.executemany('''
+            INSERT INTO daily_rollups (incident_date, neighborhood, crime_type, incidents, response_sum, response_count)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (incident_date, neighborhood, crime_type) DO UPDATE SET
+                incidents = incidents + excluded.incidents,
+                response_sum = response_sum + excluded.response_sum,
+                response_count = response_count + excluded.response_count
+            ''', [key + tuple(totals) for key, totals in rollups.items()])
+
+        return last_id - len(batch) + 1, last_id
+
+    def serve_socket(self, host='127.0.0.1', port=8765):
+        """Accept newline-delimited JSON incidents on a local TCP socket"""
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        service.submit(json.loads(line))
+                        self.wfile.write(b'ok\n')
+                    except ValueError as error:
+                        service.rejected += 1
+                        self.wfile.write(f'error: {error}\n'.encode())
+
+        server = socketserver.ThreadingTCPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='incident-socket', daemon=True).start()
+        self._background.append(server)
+        return server
+
+    def watch_directory(self, path, poll_interval=1.0):
+        """
+        Ingest .json, .jsonl and .csv files dropped into path. Files are
+        moved into path/processed once queued, or into path/failed if they
+        can't be read. Other names (e.g. incidents.json.tmp) are ignored, so
+        writers can write under a temporary name and rename when done; a
+        file is also only read once its size and modification time stayed
+        the same for a whole poll interval.
+        """
+        processed_dir = os.path.join(path, 'processed')
+        failed_dir = os.path.join(path, 'failed')
+        os.makedirs(processed_dir, exist_ok=True)
+        os.makedirs(failed_dir, exist_ok=True)
+
+        def poll():
+            last_seen = {}
+            while not self._stopping.is_set():
+                seen = {}
+                for file_name in sorted(os.listdir(path)):
+                    file_path = os.path.join(path, file_name)
+                    if not os.path.isfile(file_path) or not file_name.endswith(('.json', '.jsonl', '.csv')):
+                        continue
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+                    seen[file_name] = (stat.st_size, stat.st_mtime_ns)
+                    if last_seen.get(file_name) != seen[file_name]:
+                        # New or still being written: look again next poll
+                        continue
+                    del seen[file_name]
+                    try:
+                        self.submit_many(self._read_incident_file(file_path))
+                    except Exception as error:
+                        logger.error("Could not read incident file %s: %s", file_path, error)
+                        self.failed_files += 1
+                        os.replace(file_path, os.path.join(failed_dir, file_name))
+                        continue
+                    os.replace(file_path, os.path.join(processed_dir, file_name))
+                last_seen = seen
+                self._stopping.wait(poll_interval)
+
+        watcher = threading.Thread(target=poll, name='incident-watcher', daemon=True)
+        watcher.start()
+        self._background.append(watcher)
+        return watcher
+
+    def _read_incident_file(self, file_path):
+        """Incident dicts from a JSON array, JSON-lines or CSV file"""
+        with open(file_path, newline='') as handle:
+            if file_path.endswith('.csv'):
+                return list(csv.DictReader(handle))
+            if file_path.endswith('.jsonl'):
+                return [json.loads(line) for line in handle if line.strip()]
+            data = json.load(handle)
+            return data if isinstance(data, list) else [data]
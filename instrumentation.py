@@ -0,0 +1,91 @@
+"""
+Lightweight runtime instrumentation for the Toronto Public Safety Dashboard.
+
+Keeps per-process timings and cache hit/miss counters in memory so the
+dashboard (and the benchmark scripts) can report where a rerun spends its
+time. Everything is thread-safe because Streamlit serves each session on its
+own thread.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Recent samples kept per timing name for the percentiles
+MAX_SAMPLES = 1000
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+_call_counts = defaultdict(int)
+_cache_counts = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+
+def record_timing(name, seconds):
+    """Record one duration (in seconds) under name"""
+    with _lock:
+        _samples[name].append(seconds)
+        _call_counts[name] += 1
+
+
+@contextmanager
+def timed(name):
+    """Time the body of a with-block and record it under name"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - started)
+
+
+def call_count(name):
+    """How many timings have been recorded under name"""
+    with _lock:
+        return _call_counts.get(name, 0)
+
+
+def record_cache(name, hit):
+    """Count a cache lookup for name as a hit or a miss"""
+    with _lock:
+        _cache_counts[name]['hits' if hit else 'misses'] += 1
+
+
+def timing_summary():
+    """Per-name call count and mean/p50/p95/max milliseconds over recent samples"""
+    # Imported here so recording timings stays cheap to import at startup
+    import numpy as np
+
+    with _lock:
+        samples = {name: np.array(values) * 1000 for name, values in _samples.items()}
+        counts = dict(_call_counts)
+
+    return {
+        name: {
+            'calls': counts[name],
+            'mean_ms': float(values.mean()),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'max_ms': float(values.max()),
+        }
+        for name, values in sorted(samples.items())
+    }
+
+
+def cache_summary():
+    """Per-name hits, misses and hit rate"""
+    with _lock:
+        counts = {name: dict(values) for name, values in _cache_counts.items()}
+
+    summary = {}
+    for name, values in sorted(counts.items()):
+        lookups = values['hits'] + values['misses']
+        summary[name] = {**values, 'hit_rate': values['hits'] / lookups if lookups else 0.0}
+    return summary
+
+
+def reset():
+    """Forget everything recorded so far"""
+    with _lock:
+        _samples.clear()
+        _call_counts.clear()
+        _cache_counts.clear()
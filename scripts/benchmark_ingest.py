@@ -0,0 +1,125 @@
+"""
+⏱️ INGEST BENCHMARK - How Many Incidents Per Second Can We Absorb?
+==================================================================
+
+Pushes synthetic incidents through the live ingest service into a scratch
+database while a reader thread keeps querying it the way the dashboard
+does. Reports sustained inserts per second and reader latency, which
+should stay low because WAL mode lets readers run alongside the writer.
+
+Usage:
+    python scripts/benchmark_ingest.py --incidents 200000 --producers 4
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Make the dashboard modules importable when running from the scripts/ folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processor import CrimeDataProcessor
+from ingest_service import IncidentIngestService
+
+NEIGHBORHOODS = ['Downtown Core', 'Scarborough', 'North York', 'Etobicoke', 'East York', 'York', 'Old Toronto']
+CRIME_TYPES = ['Auto Theft', 'Drug Offenses', 'Assault', 'Break & Enter', 'Robbery', 'Fraud', 'Vandalism']
+
+
+def random_incident(rng, today):
+    return {
+        'incident_date': (today - timedelta(days=rng.randint(0, 30))).strftime('%Y-%m-%d'),
+        'neighborhood': rng.choice(NEIGHBORHOODS),
+        'crime_type': rng.choice(CRIME_TYPES),
+        'response_time_minutes': round(max(3.0, rng.normalvariate(7.5, 1.8)), 1),
+        'severity': rng.choice(['Low', 'Medium', 'High']),
+        'latitude': round(43.6532 + rng.uniform(-0.3, 0.3), 6),
+        'longitude': round(-79.3832 + rng.uniform(-0.5, 0.5), 6),
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_benchmark(total_incidents, producers, batch_size):
+    work_dir = tempfile.mkdtemp()
+    try:
+        _run_benchmark(os.path.join(work_dir, 'ingest_benchmark.db'), total_incidents, producers, batch_size)
+    finally:
+        # The scratch database (and its WAL files) is only needed while benchmarking
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _run_benchmark(db_path, total_incidents, producers, batch_size):
+    service = IncidentIngestService(db_path, batch_size=batch_size).start()
+    processor = CrimeDataProcessor(db_path)
+    today = datetime.now()
+
+    # A reader thread queries continuously, like an open dashboard would
+    reader_latencies = []
+    writing = threading.Event()
+    writing.set()
+
+    def reader():
+        while writing.is_set():
+            started = time.perf_counter()
+            processor.count_filtered_rows(date_range='3months')
+            reader_latencies.append(time.perf_counter() - started)
+
+    def producer(seed, count):
+        rng = random.Random(seed)
+        for _ in range(count):
+            service.submit(random_incident(rng, today))
+
+    per_producer = total_incidents // producers
+    reader_thread = threading.Thread(target=reader)
+    producer_threads = [threading.Thread(target=producer, args=(seed, per_producer)) for seed in range(producers)]
+
+    print(f"⏱️ Ingesting {per_producer * producers:,} incidents from {producers} producers "
+          f"(batch size {batch_size})...")
+    started = time.perf_counter()
+    reader_thread.start()
+    for thread in producer_threads:
+        thread.start()
+    for thread in producer_threads:
+        thread.join()
+    service.flush()
+    elapsed = time.perf_counter() - started
+    writing.clear()
+    reader_thread.join()
+    service.stop()
+
+    # Rollups must agree with the raw rows they summarize
+    conn = sqlite3.connect(db_path)
+    raw_count = conn.execute('SELECT COUNT(*) FROM crime_incidents').fetchone()[0]
+    rollup_count = conn.execute('SELECT COALESCE(SUM(incidents), 0) FROM daily_rollups').fetchone()[0]
+    conn.close()
+
+    print(f"\n📊 Results")
+    print(f"   Inserted:           {service.rows_written:,} incidents in {service.batches_written:,} batches")
+    print(f"   Throughput:         {service.rows_written / elapsed:,.0f} inserts/second ({elapsed:.2f}s)")
+    if reader_latencies:
+        print(f"   Reader queries:     {len(reader_latencies):,} while writing")
+        print(f"   Reader latency p50: {statistics.median(reader_latencies) * 1000:.1f} ms")
+        print(f"   Reader latency p99: {percentile(reader_latencies, 0.99) * 1000:.1f} ms")
+        print(f"   Reader latency max: {max(reader_latencies) * 1000:.1f} ms")
+    print(f"   Rollups consistent: {'yes' if raw_count == rollup_count else 'NO'} "
+          f"({raw_count:,} rows, {rollup_count:,} in rollups)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sustained incident ingestion")
+    parser.add_argument('--incidents', type=int, default=100000, help="Total incidents to ingest")
+    parser.add_argument('--producers', type=int, default=4, help="Concurrent producer threads")
+    parser.add_argument('--batch-size', type=int, default=500, help="Maximum incidents per transaction")
+    args = parser.parse_args()
+    run_benchmark(args.incidents, args.producers, args.batch_size)
@@ -0,0 +1,219 @@
+"""
+🚀 STARTUP BENCHMARK - How Fast Does a Fresh Dashboard Instance Show Data?
+=========================================================================
+
+Autoscaled instances start cold, so the first visitor pays for every import
+and every first query. This script measures that cold start in brand new
+Python processes:
+
+1. Import time: Streamlit itself, then app.py's own top-level imports, in a
+   clean interpreter, with the slowest ones from `python -X importtime`.
+   pandas and Plotly should not be among them - they load in the
+   background while the page is drawn.
+2. First run: one AppTest run of app.py in a fresh process, recording when
+   the filter controls are drawn (first paint), when the KPI cards show the
+   first data (first meaningful paint) and when the whole page is done,
+   plus a second, warm run for comparison. These are timed from the first
+   line of app.py, so they include the app's own imports.
+
+Cold start = Streamlit import + first meaningful paint. Each measurement runs
+several times and the medians are reported; --max-cold-start-ms turns the
+benchmark into a check that fails (exit code 1) above the given bound.
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --max-cold-start-ms 2500 --output startup.json
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Make the dashboard modules importable when running from the scripts/ folder
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts'))
+
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+
+# Packages that should never be on the cold start's critical path
+HEAVY_PACKAGES = ['pandas', 'numpy', 'plotly.express', 'plotly.graph_objects', 'pyarrow']
+
+
+def app_imports():
+    """Modules app.py imports at the top level, in order"""
+    with open(APP_PATH) as handle:
+        tree = ast.parse(handle.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def measure_imports(modules):
+    """
+    Import Streamlit, then the modules, in a clean interpreter.
+    Returns (Streamlit ms, modules ms, slowest modules, heavy packages they add).
+    """
+    # Streamlit loads some of these itself (Plotly for its chart theme); only
+    # the ones the app adds on top count
+    code = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        "import streamlit\n"
+        "print(round((time.perf_counter() - started) * 1000, 1))\n"
+        "started = time.perf_counter()\n"
+        f"baseline = set(p for p in {HEAVY_PACKAGES!r} if p in sys.modules)\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + "print(round((time.perf_counter() - started) * 1000, 1))\n"
+        + f"print(' '.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules and p not in baseline))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    streamlit_ms, elapsed_ms, heavy = (result.stdout.rstrip('\n') + '\n').split('\n')[:3]
+
+    # "import time: self [us] | cumulative | imported package" - app.py's own imports
+    # are the unindented ones; interpreter start-up imports are skipped
+    cumulative_ms = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() in modules and name.strip() != 'streamlit' and not name.startswith('  '):
+            cumulative_ms.setdefault(name.strip(), int(cumulative) / 1000)
+    slowest = sorted(cumulative_ms.items(), key=lambda package: package[1], reverse=True)[:5]
+    return float(streamlit_ms), float(elapsed_ms), slowest, heavy.split()
+
+
+def first_run_child(timeout):
+    """Runs inside a fresh process: one cold and one warm AppTest run, printed as JSON"""
+    from streamlit.testing.v1 import AppTest
+    import instrumentation
+
+    os.chdir(REPO_ROOT)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    started = time.perf_counter()
+    at.run()
+    first_run_ms = (time.perf_counter() - started) * 1000
+    cold = instrumentation.timing_summary()
+
+    started = time.perf_counter()
+    at.run()
+    warm_run_ms = (time.perf_counter() - started) * 1000
+
+    def first_ms(name):
+        # Only the cold run had recorded anything when `cold` was taken
+        return round(cold[name]['max_ms'], 1) if name in cold else None
+
+    print(json.dumps({
+        'first_paint_ms': first_ms('paint.controls'),
+        'first_meaningful_paint_ms': first_ms('paint.kpis'),
+        'first_run_ms': round(first_run_ms, 1),
+        'processor_load_ms': first_ms('startup.processor'),
+        'warm_run_ms': round(warm_run_ms, 1),
+        'errors': [str(exception.value) for exception in at.exception],
+    }))
+
+
+def measure_first_run(db_path, timeout):
+    env = dict(os.environ, TORONTO_CRIME_DB=db_path)
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', '--timeout', str(timeout)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median(values):
+    values = [value for value in values if value is not None]
+    return round(statistics.median(values), 1) if values else None
+
+
+def run_benchmark(db_path, runs, timeout):
+    if not os.path.exists(db_path):
+        from setup_database import create_database
+        create_database(db_path)
+        print()
+
+    modules = app_imports()
+    print(f"🚀 Measuring cold starts of app.py ({runs} fresh processes each)...")
+    print(f"   Top-level imports: {', '.join(modules)}")
+
+    import_runs = [measure_imports(modules) for _ in range(runs)]
+    first_runs = []
+    for run in range(runs):
+        first_runs.append(measure_first_run(db_path, timeout))
+        print(f"   ✅ Run {run + 1}/{runs}: first meaningful paint "
+              f"{first_runs[-1]['first_meaningful_paint_ms']} ms")
+
+    streamlit_import_ms = median([run[0] for run in import_runs])
+    first_meaningful_paint_ms = median([run['first_meaningful_paint_ms'] for run in first_runs])
+    return {
+        'config': {'db_path': db_path, 'runs': runs, 'python': sys.version.split()[0]},
+        'streamlit_import_ms': streamlit_import_ms,
+        'app_imports_ms': median([run[1] for run in import_runs]),
+        'slowest_imports_ms': {name: round(ms, 1) for name, ms in import_runs[-1][2]},
+        'heavy_packages_imported': import_runs[-1][3],
+        'first_paint_ms': median([run['first_paint_ms'] for run in first_runs]),
+        'first_meaningful_paint_ms': first_meaningful_paint_ms,
+        'first_run_ms': median([run['first_run_ms'] for run in first_runs]),
+        'processor_load_ms': median([run['processor_load_ms'] for run in first_runs]),
+        'warm_run_ms': median([run['warm_run_ms'] for run in first_runs]),
+        'cold_start_ms': round(streamlit_import_ms + first_meaningful_paint_ms, 1),
+        'errors': [error for run in first_runs for error in run['errors']],
+    }
+
+
+def print_report(report):
+    print(f"\n📊 Results (medians)")
+    print(f"   Streamlit import:         {report['streamlit_import_ms']} ms")
+    print(f"   App imports:              {report['app_imports_ms']} ms")
+    for name, ms in report['slowest_imports_ms'].items():
+        print(f"      {name + ':':<24} {ms} ms")
+    if report['heavy_packages_imported']:
+        print(f"   ⚠️ Heavy packages on the import path: {', '.join(report['heavy_packages_imported'])}")
+    print(f"   First paint (filters):    {report['first_paint_ms']} ms")
+    print(f"   First meaningful paint:   {report['first_meaningful_paint_ms']} ms "
+          f"(processor ready after {report['processor_load_ms']} ms)")
+    print(f"   Complete first run:       {report['first_run_ms']} ms")
+    print(f"   Warm rerun:               {report['warm_run_ms']} ms")
+    print(f"   ⚡ Cold start:             {report['cold_start_ms']} ms (Streamlit import + first meaningful paint)")
+    if report['errors']:
+        print(f"   ⚠️ Errors:                 {len(report['errors'])} (first: {report['errors'][0]})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's cold start")
+    parser.add_argument('--db', default=os.path.join(REPO_ROOT, 'toronto_crime.db'),
+                        help="Database to start against (generated if missing)")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument('--timeout', type=float, default=120, help="Seconds allowed per AppTest run")
+    parser.add_argument('--max-cold-start-ms', type=float, help="Fail if the median cold start is slower")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        first_run_child(args.timeout)
+        sys.exit(0)
+
+    report = run_benchmark(os.path.abspath(args.db), args.runs, args.timeout)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\n📁 Results saved as: {args.output}")
+    if args.max_cold_start_ms and report['cold_start_ms'] > args.max_cold_start_ms:
+        print(f"\n❌ Cold start {report['cold_start_ms']} ms is above the {args.max_cold_start_ms:g} ms bound")
+        sys.exit(1)
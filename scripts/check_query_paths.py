@@ -0,0 +1,675 @@
+"""
+🔬 QUERY PATH CHECK - Do the Fast Paths Still Give the Same Answers?
+====================================================================
+
+The dashboard's CrimeDataProcessor has grown several faster ways of
+answering the same questions: SQL pushdown on the raw incidents, the
+pre-aggregated daily_rollups table, per-year/per-quarter shards and
+incrementally maintained caches. This script proves they all still match
+the original pandas semantics.
+
+Each round it:
+1. Generates a random database (random size, dates, districts, missing
+   response times - for a whole district at times - custom or missing
+   config tables, sometimes empty)
+2. Builds every engine on top of it:
+   - raw       the database without daily_rollups, so queries hit crime_incidents
+   - rollups   the full database, so grouped queries read daily_rollups
+   - sharded   the database split into per-year or per-quarter shards
+3. Runs random filter combinations through the reference pandas
+   implementation below and through each engine, comparing every value
+   (a missing one only matches another missing one), rounding, column
+   order and empty-result shape
+4. Appends new incidents through the live ingest service and checks the
+   rollups engine again, so the incremental caches are covered too
+
+Any divergence is reported with the seed that reproduces it, and the exit
+code is 1. A default run takes well under a minute, so it can be run for
+every performance change.
+
+Usage:
+    python scripts/check_query_paths.py                  # 5 random rounds
+    python scripts/check_query_paths.py --rounds 50 --max-incidents 20000
+    python scripts/check_query_paths.py --seed 1234 --rounds 1 --verbose
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Make the dashboard modules importable when running from the scripts/ folder
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts'))
+
+from data_processor import (
+    CrimeDataProcessor, ALL_NEIGHBORHOODS, ALL_CRIME_TYPES, DEFAULT_RISK_THRESHOLDS,
+    DEFAULT_CRIME_TYPE_PRIORITIES, ANOMALY_BASELINE_WEEKS, EXPORT_COLUMNS, normalize_selection
+)
+from ingest_service import IncidentIngestService, INCIDENTS_DDL, ROLLUPS_DDL, ROLLUPS_BACKFILL
+from shard_database import shard_database
+
+NEIGHBORHOODS = ['Downtown Core', 'Scarborough', 'North York', 'Etobicoke', 'East York', 'York', 'Old Toronto']
+CRIME_TYPES = ['Auto Theft', 'Drug Offenses', 'Assault', 'Break & Enter', 'Robbery', 'Fraud', 'Vandalism']
+DATE_RANGES = ['3months', '6months', '12months', '24months']
+PERIOD_DAYS = {'3months': 90, '6months': 180, '12months': 365, '24months': 730}
+
+# Loose anomaly settings, so small random databases still produce spikes
+ANOMALY_ARGS = dict(days=30, z_threshold=1.0, min_incidents=1, limit=100000)
+
+
+# =============================================================================
+# 📚 REFERENCE IMPLEMENTATION - The Original Pandas Semantics
+# =============================================================================
+
+class ReferenceProcessor:
+    """
+    Straightforward pandas versions of the CrimeDataProcessor methods, as
+    originally written: load the incidents, filter them in memory, group
+    with pandas. Filters accept the same single values, "All ..." labels
+    and collections as the real processor.
+    """
+
+    def __init__(self, db_path):
+        conn = sqlite3.connect(db_path)
+        self.incidents = pd.read_sql_query("SELECT * FROM crime_incidents ORDER BY id", conn)
+        self.neighborhoods = pd.read_sql_query("SELECT name, population, area_km2 FROM neighborhoods", conn)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'risk_thresholds' in tables:
+            self.thresholds = pd.read_sql_query("SELECT metric, tier, min_value FROM risk_thresholds", conn)
+        else:
+            self.thresholds = pd.DataFrame(DEFAULT_RISK_THRESHOLDS, columns=['metric', 'tier', 'min_value'])
+        if 'crime_type_priorities' in tables:
+            self.priorities = pd.read_sql_query("SELECT crime_type, priority FROM crime_type_priorities", conn)
+        else:
+            self.priorities = pd.DataFrame(DEFAULT_CRIME_TYPE_PRIORITIES, columns=['crime_type', 'priority'])
+        conn.close()
+
+    def window(self, date_range):
+        end_date = datetime.now()
+        return end_date - timedelta(days=PERIOD_DAYS[date_range]), end_date
+
+    def between(self, start, end, neighborhood=ALL_NEIGHBORHOODS, crime_type=ALL_CRIME_TYPES):
+        """Incidents between two date strings that match the filters"""
+        df = self.incidents
+        mask = (df['incident_date'] >= start) & (df['incident_date'] <= end)
+        neighborhoods = normalize_selection(neighborhood, ALL_NEIGHBORHOODS)
+        if neighborhoods is not None:
+            mask &= df['neighborhood'].isin(neighborhoods)
+        crime_types = normalize_selection(crime_type, ALL_CRIME_TYPES)
+        if crime_types is not None:
+            mask &= df['crime_type'].isin(crime_types)
+        return df[mask].reset_index(drop=True)
+
+    def get_filtered_data(self, neighborhood, crime_type, date_range):
+        start, end = self.window(date_range)
+        df = self.between(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), neighborhood, crime_type)
+        if not df.empty:
+            df['incident_date'] = pd.to_datetime(df['incident_date'])
+        return df
+
+    def count_filtered_rows(self, neighborhood, crime_type, date_range):
+        return len(self.get_filtered_data(neighborhood, crime_type, date_range))
+
+    def get_monthly_trends(self, neighborhood, crime_type, date_range):
+        df = self.get_filtered_data(neighborhood, crime_type, date_range)
+        if df.empty:
+            return pd.DataFrame(columns=['year_month', 'incidents'])
+        df['year_month'] = df['incident_date'].dt.to_period('M')
+        monthly_trends = df.groupby('year_month').size().reset_index(name='incidents')
+        monthly_trends['year_month'] = monthly_trends['year_month'].astype(str)
+        return monthly_trends
+
+    def period_labels(self, dates, granularity):
+        if granularity == 'day':
+            return dates.dt.strftime('%Y-%m-%d')
+        if granularity == 'week':
+            return (dates - pd.to_timedelta(dates.dt.weekday, unit='D')).dt.strftime('%Y-%m-%d')
+        if granularity == 'month':
+            return dates.dt.strftime('%Y-%m')
+        return dates.dt.year.astype(str) + '-Q' + dates.dt.quarter.astype(str)
+
+    def get_incident_trends(self, neighborhood, crime_type, date_range, granularity):
+        df = self.get_filtered_data(neighborhood, crime_type, date_range)
+        if df.empty:
+            return pd.DataFrame(columns=['period', 'incidents'])
+        df['period'] = self.period_labels(df['incident_date'], granularity)
+        return df.groupby('period').size().reset_index(name='incidents')
+
+    def get_response_time_trends(self, neighborhood, date_range, granularity):
+        df = self.get_filtered_data(neighborhood, ALL_CRIME_TYPES, date_range)
+        if df.empty:
+            return pd.DataFrame(columns=['period', 'response_time_minutes'])
+        df['period'] = self.period_labels(df['incident_date'], granularity)
+        response_trends = df.groupby('period')['response_time_minutes'].mean().reset_index()
+        response_trends['response_time_minutes'] = response_trends['response_time_minutes'].round(1)
+        return response_trends
+
+    def get_crime_type_distribution(self, neighborhood, date_range):
+        df = self.get_filtered_data(neighborhood, ALL_CRIME_TYPES, date_range)
+        if df.empty:
+            return pd.DataFrame(columns=['crime_type', 'count', 'percentage', 'priority'])
+        distribution = df['crime_type'].value_counts().reset_index()
+        distribution.columns = ['crime_type', 'count']
+        distribution['percentage'] = (distribution['count'] / distribution['count'].sum() * 100).round(1)
+        distribution = distribution.merge(self.priorities, on='crime_type', how='left')
+        distribution['priority'] = distribution['priority'].fillna('Standard Priority')
+        return distribution
+
+    def get_response_time_analysis(self, neighborhood, date_range):
+        df = self.get_filtered_data(neighborhood, ALL_CRIME_TYPES, date_range)
+        if df.empty:
+            return (pd.DataFrame(columns=['year_month', 'response_time_minutes']),
+                    pd.DataFrame(columns=['neighborhood', 'response_time_minutes', 'target']))
+        df['year_month'] = df['incident_date'].dt.to_period('M')
+        monthly_response = df.groupby('year_month')['response_time_minutes'].mean().reset_index()
+        monthly_response['year_month'] = monthly_response['year_month'].astype(str)
+        monthly_response['response_time_minutes'] = monthly_response['response_time_minutes'].round(1)
+        neighborhood_response = df.groupby('neighborhood')['response_time_minutes'].mean().reset_index()
+        neighborhood_response['response_time_minutes'] = neighborhood_response['response_time_minutes'].round(1)
+        neighborhood_response['target'] = 8.0
+        return monthly_response, neighborhood_response
+
+    def get_neighborhood_comparison(self, crime_type, date_range):
+        df = self.get_filtered_data(ALL_NEIGHBORHOODS, crime_type, date_range)
+        if df.empty:
+            return pd.DataFrame(columns=['neighborhood', 'incidents', 'avg_response_time', 'risk_level'])
+        comparison = df.groupby('neighborhood').agg({'id': 'count', 'response_time_minutes': 'mean'}).round(1)
+        comparison.columns = ['incidents', 'avg_response_time']
+        comparison = comparison.reset_index()
+        comparison['risk_level'] = pd.cut(
+            comparison['incidents'], bins=[0, 150, 300, float('inf')], labels=['Low', 'Medium', 'High']
+        )
+        return comparison
+
+    def tier(self, values, metric):
+        """Highest tier whose min_value the value reaches"""
+        tiers = self.thresholds[self.thresholds['metric'] == metric].sort_values('min_value')
+        bins = list(tiers['min_value']) + [float('inf')]
+        return pd.cut(values, bins=bins, labels=list(tiers['tier']), right=False).astype(object)
+
+    def get_neighborhood_risk_classification(self, crime_type, date_range):
+        start, end = self.window(date_range)
+        annualize = 365.0 / max((end - start).days, 1)
+        df = self.get_filtered_data(ALL_NEIGHBORHOODS, crime_type, date_range)
+        stats = df.groupby('neighborhood').agg(
+            incidents=('id', 'count'), avg_response_time=('response_time_minutes', 'mean')
+        )
+        rates = self.neighborhoods.rename(columns={'name': 'neighborhood'}).merge(
+            stats, left_on='neighborhood', right_index=True, how='left'
+        )
+        rates['incidents'] = rates['incidents'].fillna(0).astype(int)
+        rates['incidents_per_100k'] = rates['incidents'] * annualize * 100000.0 / rates['population']
+        rates['incidents_per_km2'] = rates['incidents'] * annualize / rates['area_km2']
+        rates['risk_level'] = self.tier(rates['incidents_per_100k'], 'incidents_per_100k')
+        rates['density_level'] = self.tier(rates['incidents_per_km2'], 'incidents_per_km2')
+        levels = rates[['risk_level', 'density_level']]
+        rates['priority'] = np.where(
+            (levels == 'High').any(axis=1), 'High Priority',
+            np.where((levels == 'Medium').any(axis=1), 'Medium Priority', 'Standard Priority')
+        )
+        rates = rates.sort_values(['incidents_per_100k', 'neighborhood'], ascending=[False, True])
+        rates = rates[['neighborhood', 'incidents', 'avg_response_time', 'population', 'area_km2',
+                       'incidents_per_100k', 'incidents_per_km2', 'risk_level', 'density_level', 'priority']]
+        rates[['avg_response_time', 'incidents_per_100k', 'incidents_per_km2']] = \
+            rates[['avg_response_time', 'incidents_per_100k', 'incidents_per_km2']].round(1)
+        return rates.reset_index(drop=True)
+
+    def previous_window(self, date_range):
+        prev_days = PERIOD_DAYS[date_range]
+        end_date = datetime.now() - timedelta(days=prev_days)
+        return (end_date - timedelta(days=prev_days)).strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+
+    def get_safety_metrics(self, neighborhood, crime_type, date_range):
+        current_df = self.get_filtered_data(neighborhood, crime_type, date_range)
+        prev_df = self.between(*self.previous_window(date_range), neighborhood, crime_type)
+
+        total_incidents = len(current_df)
+        prev_incidents = len(prev_df)
+        change_percent = ((total_incidents - prev_incidents) / max(prev_incidents, 1) * 100) if prev_incidents > 0 else 0
+
+        avg_response_time = current_df['response_time_minutes'].mean() if len(current_df) > 0 else 0
+        prev_response_time = prev_df['response_time_minutes'].mean() if len(prev_df) > 0 else 0
+        response_change = ((avg_response_time - prev_response_time) / max(prev_response_time, 1) * 100) if prev_response_time > 0 else 0
+
+        classification = self.get_neighborhood_risk_classification(crime_type, date_range)
+        high_risk_areas = int((classification['priority'] == 'High Priority').sum())
+
+        safety_score = max(0, 10 - (total_incidents / 100) - (avg_response_time / 2))
+        safety_score = min(10, safety_score)
+
+        return {
+            'total_incidents': total_incidents,
+            'change_percent': round(change_percent, 1),
+            'avg_response_time': round(avg_response_time, 1),
+            'response_change': round(response_change, 1),
+            'high_risk_areas': high_risk_areas,
+            'safety_score': round(safety_score, 1)
+        }
+
+    def get_live_snapshot(self, neighborhood, crime_type, date_range):
+        return (self.get_monthly_trends(neighborhood, crime_type, date_range),
+                self.get_safety_metrics(neighborhood, crime_type, date_range))
+
+    def get_crime_matrix(self, neighborhood, crime_type, date_range):
+        start, end = self.window(date_range)
+        current = self.between(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), neighborhood, crime_type)
+        previous = self.between(*self.previous_window(date_range), neighborhood, crime_type)
+
+        keys = ['neighborhood', 'crime_type']
+        stats = current.groupby(keys).agg(
+            incidents=('id', 'count'), avg_response_time=('response_time_minutes', 'mean')
+        )
+        prev_counts = previous.groupby(keys).size().rename('prev_incidents')
+        matrix = stats.join(prev_counts, how='outer').reset_index()
+        matrix['incidents'] = matrix['incidents'].fillna(0).astype(int)
+        matrix['prev_incidents'] = matrix['prev_incidents'].fillna(0).astype(int)
+        matrix['avg_response_time'] = matrix['avg_response_time'].round(1)
+        matrix['change'] = matrix['incidents'] - matrix['prev_incidents']
+        matrix['change_percent'] = [
+            round(change / prev * 100, 1) if prev > 0 else 0.0
+            for change, prev in zip(matrix['change'], matrix['prev_incidents'])
+        ]
+        return matrix[['neighborhood', 'crime_type', 'incidents', 'avg_response_time',
+                       'prev_incidents', 'change', 'change_percent']]
+
+    def get_incident_pages(self, neighborhood, crime_type, date_range, page_size):
+        df = self.get_filtered_data(neighborhood, crime_type, date_range)
+        df = df.sort_values(['incident_date', 'id'], ascending=False, ignore_index=True)
+        df = df[['id', 'incident_date', 'neighborhood', 'crime_type', 'response_time_minutes', 'severity']]
+        return [df.iloc[start:start + page_size].reset_index(drop=True) for start in range(0, max(len(df), 1), page_size)]
+
+    def get_filtered_chunks(self, neighborhood, crime_type, date_range):
+        start, end = self.window(date_range)
+        df = self.between(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), neighborhood, crime_type)
+        return df.sort_values(['incident_date', 'id'], ignore_index=True)[EXPORT_COLUMNS]
+
+    def get_anomalies(self, days, z_threshold, min_incidents, limit):
+        weeks = ANOMALY_BASELINE_WEEKS
+        end = pd.Timestamp(datetime.now().date())
+        all_days = pd.date_range(end - pd.Timedelta(days=7 * weeks + days - 1), end).strftime('%Y-%m-%d')
+        df = self.between(all_days[0], all_days[-1])
+        counts = (df.groupby(['neighborhood', 'crime_type', 'incident_date']).size()
+                  .unstack(fill_value=0).reindex(columns=all_days, fill_value=0).astype(float))
+        if counts.empty:
+            return pd.DataFrame(columns=['incident_date', 'neighborhood', 'crime_type', 'incidents',
+                                         'baseline', 'z_score'])
+
+        lagged = [counts.shift(7 * k, axis=1) for k in range(1, weeks + 1)]
+        baseline = sum(lagged) / weeks
+        spread = (sum((lag - baseline) ** 2 for lag in lagged) / weeks) ** 0.5
+        spread = np.maximum(spread, np.sqrt(np.maximum(baseline, 1.0)))
+        zscores = (counts - baseline) / spread
+
+        scored = all_days[-days:]
+        result = pd.DataFrame({
+            'incidents': counts[scored].stack(),
+            'baseline': baseline[scored].stack(),
+            'z_score': zscores[scored].stack(),
+        }).rename_axis(['neighborhood', 'crime_type', 'incident_date']).reset_index()
+        result = result[(result['z_score'] >= z_threshold) & (result['incidents'] >= min_incidents)]
+        result = result.sort_values('z_score', ascending=False, kind='stable').head(limit)
+        result['incidents'] = result['incidents'].astype(int)
+        result[['baseline', 'z_score']] = result[['baseline', 'z_score']].round(1)
+        return result[['incident_date', 'neighborhood', 'crime_type', 'incidents', 'baseline', 'z_score']]
+
+
+# =============================================================================
+# 🎲 RANDOM DATABASES - Shapes the Sample Data Never Has
+# =============================================================================
+
+def random_incident(rng, today, neighborhoods, crime_types):
+    # Boundary days of every analysis window are common on purpose
+    if rng.random() < 0.1:
+        days_ago = rng.choice([0, 90, 180, 365, 730, 1460])
+    else:
+        days_ago = rng.randint(0, 800)
+    return {
+        'incident_date': (today - timedelta(days=days_ago)).strftime('%Y-%m-%d'),
+        'neighborhood': rng.choice(neighborhoods),
+        'crime_type': rng.choice(crime_types),
+        'response_time_minutes': None if rng.random() < 0.05 else round(max(3.0, rng.normalvariate(7.5, 2.0)), 1),
+        'severity': rng.choice(['Low', 'Medium', 'High']),
+        'latitude': round(43.6532 + rng.uniform(-0.3, 0.3), 6),
+        'longitude': round(-79.3832 + rng.uniform(-0.5, 0.5), 6),
+    }
+
+
+def create_random_database(path, rng, max_incidents):
+    """
+    A database with a random mix of incidents and configuration.
+    Returns (neighborhoods, crime_types, district without any recorded
+    response time or None).
+    """
+    today = datetime.now()
+    neighborhoods = rng.sample(NEIGHBORHOODS, rng.randint(2, len(NEIGHBORHOODS)))
+    crime_types = rng.sample(CRIME_TYPES, rng.randint(1, len(CRIME_TYPES)))
+    # Some incidents come from districts the neighborhoods table doesn't know
+    incident_neighborhoods = neighborhoods + (['Unlisted District'] if rng.random() < 0.3 else [])
+    num_incidents = 0 if rng.random() < 0.1 else rng.randint(1, max_incidents)
+
+    conn = sqlite3.connect(path)
+    conn.execute(INCIDENTS_DDL)
+    conn.execute(ROLLUPS_DDL)
+    conn.execute('CREATE TABLE neighborhoods (id INTEGER PRIMARY KEY, name TEXT UNIQUE, population INTEGER, area_km2 REAL)')
+    conn.executemany('INSERT INTO neighborhoods (name, population, area_km2) VALUES (?, ?, ?)', [
+        (name, rng.randint(20000, 700000), round(rng.uniform(10, 200), 1)) for name in neighborhoods
+    ])
+
+    # Config tables are random, default-valued or missing altogether
+    if rng.random() < 0.7:
+        conn.execute('CREATE TABLE risk_thresholds (metric TEXT, tier TEXT, min_value REAL, PRIMARY KEY (metric, tier))')
+        for metric in ['incidents_per_100k', 'incidents_per_km2']:
+            medium = round(rng.uniform(1, 100), 1)
+            high = round(medium + rng.uniform(1, 200), 1)
+            conn.executemany('INSERT INTO risk_thresholds VALUES (?, ?, ?)',
+                             [(metric, 'Low', 0.0), (metric, 'Medium', medium), (metric, 'High', high)])
+    if rng.random() < 0.7:
+        conn.execute('CREATE TABLE crime_type_priorities (crime_type TEXT PRIMARY KEY, priority TEXT)')
+        conn.executemany('INSERT INTO crime_type_priorities VALUES (?, ?)', [
+            (crime_type, rng.choice(['High Priority', 'Medium Priority', 'Standard Priority']))
+            for crime_type in rng.sample(crime_types, rng.randint(0, len(crime_types)))
+        ])
+
+    incidents = [random_incident(rng, today, incident_neighborhoods, crime_types) for _ in range(num_incidents)]
+    conn.executemany(
+        'INSERT INTO crime_incidents (incident_date, neighborhood, crime_type, response_time_minutes, '
+        'severity, latitude, longitude) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [tuple(incident.values()) for incident in incidents]
+    )
+    # Sometimes one district has no response time recorded at all
+    unrecorded = rng.choice(incident_neighborhoods) if rng.random() < 0.5 else None
+    conn.execute('UPDATE crime_incidents SET response_time_minutes = NULL WHERE neighborhood = ?', (unrecorded,))
+    conn.execute('CREATE INDEX idx_incidents_date ON crime_incidents (incident_date)')
+    conn.execute('CREATE INDEX idx_incidents_filters ON crime_incidents (neighborhood, crime_type, incident_date)')
+    conn.execute('CREATE INDEX idx_incidents_neighborhood_date ON crime_incidents (neighborhood, incident_date)')
+    conn.execute(ROLLUPS_BACKFILL)
+    conn.commit()
+    conn.close()
+    return incident_neighborhoods, crime_types, unrecorded
+
+
+def random_selection(rng, values, all_label):
+    """A filter value in any of the forms the processor accepts"""
+    choice = rng.random()
+    if choice < 0.3:
+        return all_label
+    if choice < 0.5:
+        return rng.choice(values + ['Nowhere'])
+    if choice < 0.6:
+        return []
+    return rng.sample(values, rng.randint(1, len(values)))
+
+
+def build_engines(work_dir, db_path, rng):
+    """The accelerated processors to check, by name"""
+    raw_path = os.path.join(work_dir, 'raw.db')
+    shutil.copy(db_path, raw_path)
+    conn = sqlite3.connect(raw_path)
+    conn.execute('DROP TABLE daily_rollups')
+    conn.commit()
+    conn.close()
+
+    by = rng.choice(['year', 'quarter'])
+    shard_dir = os.path.join(work_dir, 'shards')
+    shard_database(db_path, shard_dir, by)
+
+    return {
+        'raw': CrimeDataProcessor(raw_path),
+        'rollups': CrimeDataProcessor(db_path),
+        f'sharded-{by}': CrimeDataProcessor(shard_dir=shard_dir),
+    }
+
+
+# =============================================================================
+# ⚖️ COMPARISON - What Counts as "The Same"
+# =============================================================================
+
+# Averages are rounded to one decimal. SQLite, the rollups and pandas add
+# floats in a different order, so a mean that lands exactly on a .x5
+# boundary may round either way; one step in the last digit is allowed.
+ROUNDING_TOLERANCE = 0.1 + 1e-9
+
+
+def as_comparable(frame, sort_by):
+    frame = frame.copy()
+    for column in frame.columns:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].astype(object)
+        # None and NaN are both "missing"
+        frame[column] = frame[column].where(frame[column].notna(), np.nan)
+    if sort_by:
+        frame = frame.sort_values(sort_by, kind='stable')
+    return frame.reset_index(drop=True)
+
+
+def is_rounded(values):
+    values = pd.to_numeric(pd.Series(values), errors='coerce').dropna()
+    return bool(np.allclose(values, values.round(1), rtol=0, atol=1e-9))
+
+
+def is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def same_number(expected, actual):
+    """Whether a KPI value matches; a missing value (None/NaN) only matches another missing one"""
+    if is_missing(expected) or is_missing(actual):
+        return is_missing(expected) and is_missing(actual)
+    return (isinstance(actual, (int, float))
+            and abs(actual - expected) <= ROUNDING_TOLERANCE
+            and (not isinstance(expected, float) or is_rounded([actual])))
+
+
+def difference(expected, actual, sort_by=None):
+    """None when the results match, otherwise a short description"""
+    if isinstance(expected, pd.DataFrame):
+        if not isinstance(actual, pd.DataFrame):
+            return f"expected a DataFrame, got {type(actual).__name__}"
+        if list(expected.columns) != list(actual.columns):
+            return f"columns {list(actual.columns)} != {list(expected.columns)}"
+        if len(expected) != len(actual):
+            return f"{len(actual)} rows != {len(expected)}"
+        if expected.empty:
+            return None
+        expected, actual = as_comparable(expected, sort_by), as_comparable(actual, sort_by)
+        try:
+            pd.testing.assert_frame_equal(
+                expected, actual, check_dtype=False, check_exact=False, rtol=0, atol=ROUNDING_TOLERANCE
+            )
+        except AssertionError as error:
+            return ' '.join(str(error).split())[:300]
+        # The tolerance must not hide a missing round()
+        for column in expected.columns:
+            if expected[column].dtype.kind == 'f' and is_rounded(expected[column]) and not is_rounded(actual[column]):
+                return f"column {column} is not rounded to one decimal"
+        return None
+    if isinstance(expected, dict):
+        diffs = {
+            key: (actual.get(key), value) for key, value in expected.items()
+            if not same_number(value, actual.get(key))
+        }
+        return f"(actual, expected) {diffs}" if diffs else None
+    return None if expected == actual else f"{actual!r} != {expected!r}"
+
+
+class Results:
+    def __init__(self, verbose):
+        self.verbose = verbose
+        self.checks = defaultdict(int)
+        self.divergences = []
+
+    def check(self, seed, engine, method, args, expected, actual, sort_by=None):
+        self.checks[(engine, method)] += 1
+        problem = difference(expected, actual, sort_by)
+        if problem:
+            self.divergences.append((seed, engine, method, args, problem))
+            if self.verbose:
+                print(f"   ❌ seed {seed} {engine}.{method}{args}: {problem}")
+
+
+def check_filters(results, seed, reference, engines, neighborhood, crime_type, date_range, rng, methods=None):
+    """Compare every method for one filter combination"""
+    nb_args = (neighborhood, crime_type, date_range)
+    granularity = rng.choice(['day', 'week', 'month', 'quarter'])
+    page_size = rng.choice([7, 100, 1000])
+    checks = {
+        'get_filtered_data': (nb_args, ['id']),
+        'count_filtered_rows': (nb_args, None),
+        'get_monthly_trends': (nb_args, None),
+        'get_incident_trends': (nb_args + (granularity,), None),
+        'get_crime_type_distribution': ((neighborhood, date_range), ['crime_type']),
+        'get_response_time_analysis': ((neighborhood, date_range), None),
+        # Every granularity: each one groups on its own period expression
+        **{
+            f'get_response_time_trends ({period})': ((neighborhood, date_range, period), None)
+            for period in ['day', 'week', 'month', 'quarter']
+        },
+        'get_neighborhood_comparison': ((crime_type, date_range), ['neighborhood']),
+        'get_neighborhood_risk_classification': ((crime_type, date_range), None),
+        'get_safety_metrics': (nb_args, None),
+        'get_live_snapshot': (nb_args, None),
+        'get_crime_matrix': (nb_args, ['neighborhood', 'crime_type']),
+    }
+    for name, engine in engines.items():
+        for method, (args, sort_by) in checks.items():
+            function = method.split(' (')[0]
+            if methods and function not in methods:
+                continue
+            expected = getattr(reference, function)(*args)
+            actual = getattr(engine, function)(*args)
+            if isinstance(expected, tuple):
+                for part, (expected_part, actual_part) in enumerate(zip(expected, actual)):
+                    results.check(seed, name, f"{method}[{part}]", args, expected_part, actual_part, sort_by)
+            else:
+                results.check(seed, name, method, args, expected, actual, sort_by)
+
+        if methods and 'pages' not in methods:
+            continue
+        # Walk every page with the keyset cursor
+        expected_pages = reference.get_incident_pages(*nb_args, page_size)
+        cursor, actual_pages = None, []
+        for _ in expected_pages:
+            page, cursor = engine.get_incident_page(*nb_args, page_size=page_size, after=cursor)
+            actual_pages.append(page)
+            if cursor is None:
+                break
+        results.check(seed, name, 'get_incident_page (sizes)', nb_args + (page_size,),
+                      [len(page) for page in expected_pages], [len(page) for page in actual_pages])
+        results.check(seed, name, 'get_incident_page', nb_args + (page_size,),
+                      pd.concat(expected_pages, ignore_index=True), pd.concat(actual_pages, ignore_index=True))
+
+        chunks = list(engine.iter_filtered_chunks(*nb_args, chunk_size=page_size))
+        actual = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=EXPORT_COLUMNS)
+        results.check(seed, name, 'iter_filtered_chunks', nb_args, reference.get_filtered_chunks(*nb_args), actual)
+        results.check(seed, name, 'iter_filtered_chunks (size)', nb_args,
+                      True, all(len(chunk) <= page_size for chunk in chunks))
+
+
+def check_anomalies(results, seed, reference, engines):
+    expected = reference.get_anomalies(**ANOMALY_ARGS)
+    sort_by = ['z_score', 'incident_date', 'neighborhood', 'crime_type']
+    for name, engine in engines.items():
+        results.check(seed, name, 'get_anomalies', (), expected, engine.get_anomalies(**ANOMALY_ARGS), sort_by)
+
+
+def ingest_random_incidents(db_path, rng, neighborhoods, crime_types):
+    """Append recent incidents through the live ingest service"""
+    today = datetime.now()
+    service = IncidentIngestService(db_path, batch_size=rng.choice([1, 10, 500]), flush_interval=0.01).start()
+    # New districts and incident types appear too
+    neighborhoods = neighborhoods + ['New District']
+    crime_types = crime_types + ['New Offence']
+    for _ in range(rng.randint(1, 300)):
+        incident = random_incident(rng, today, neighborhoods, crime_types)
+        incident['incident_date'] = (today - timedelta(days=rng.randint(0, 60))).strftime('%Y-%m-%d')
+        service.submit(incident)
+    service.flush()
+    service.stop()
+
+
+def run_round(results, seed, max_incidents, combos):
+    rng = random.Random(seed)
+    work_dir = tempfile.mkdtemp(prefix='query_paths_')
+    try:
+        db_path = os.path.join(work_dir, 'toronto_crime.db')
+        neighborhoods, crime_types, unrecorded = create_random_database(db_path, rng, max_incidents)
+        engines = build_engines(work_dir, db_path, rng)
+        reference = ReferenceProcessor(db_path)
+
+        filter_sets = [(ALL_NEIGHBORHOODS, ALL_CRIME_TYPES, '12months')] + [
+            (random_selection(rng, neighborhoods, ALL_NEIGHBORHOODS),
+             random_selection(rng, crime_types, ALL_CRIME_TYPES),
+             rng.choice(DATE_RANGES))
+            for _ in range(combos)
+        ]
+        if unrecorded:
+            # KPIs and response times for a selection without any response time
+            filter_sets.append((unrecorded, rng.choice([ALL_CRIME_TYPES, crime_types[0]]), rng.choice(DATE_RANGES)))
+        for filters in filter_sets:
+            check_filters(results, seed, reference, engines, *filters, rng)
+        check_anomalies(results, seed, reference, engines)
+
+        # New incidents must flow into the rollups and the incremental caches
+        ingest_random_incidents(db_path, rng, neighborhoods, crime_types)
+        reference = ReferenceProcessor(db_path)
+        live_engine = {'rollups (after ingest)': engines['rollups']}
+        incremental = ['get_live_snapshot', 'get_safety_metrics', 'get_monthly_trends',
+                       'get_incident_trends', 'get_crime_matrix', 'get_response_time_analysis',
+                       'get_response_time_trends', 'get_crime_type_distribution']
+        for filters in filter_sets:
+            check_filters(results, seed, reference, live_engine, *filters, rng, methods=incremental)
+        check_anomalies(results, seed, reference, live_engine)
+
+        for engine in engines.values():
+            if engine.shard_router:
+                engine.shard_router.executor.shutdown()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(rounds, seed, max_incidents, combos, verbose):
+    results = Results(verbose)
+    started = time.perf_counter()
+    print(f"🔬 Checking accelerated query paths against the pandas reference "
+          f"({rounds} rounds, seed {seed})...")
+    for round_number in range(rounds):
+        run_round(results, seed + round_number, max_incidents, combos)
+
+    print(f"\n📊 Results ({time.perf_counter() - started:.1f}s)")
+    by_engine = defaultdict(int)
+    for (engine, _), count in results.checks.items():
+        by_engine[engine] += count
+    for engine, count in sorted(by_engine.items()):
+        failed = sum(1 for divergence in results.divergences if divergence[1] == engine)
+        print(f"   {engine + ':':<26} {count:>6,} checks, {failed} divergences")
+
+    if not results.divergences:
+        print("\n✅ Every engine matches the reference")
+        return 0
+
+    print(f"\n❌ {len(results.divergences)} divergences (first 10):")
+    for seed, engine, method, args, problem in results.divergences[:10]:
+        print(f"   seed {seed} {engine}.{method}{args}\n      {problem}")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare accelerated query paths with the pandas reference")
+    parser.add_argument('--rounds', type=int, default=5, help="Random databases to generate")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the first round (round i uses seed + i)")
+    parser.add_argument('--max-incidents', type=int, default=1500, help="Largest random database")
+    parser.add_argument('--combos', type=int, default=4, help="Random filter combinations per database")
+    parser.add_argument('--verbose', action='store_true', help="Print every divergence as it is found")
+    args = parser.parse_args()
+    sys.exit(main(args.rounds, args.seed, args.max_incidents, args.combos, args.verbose))
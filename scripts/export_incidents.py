@@ -0,0 +1,73 @@
+"""
+📥 INCIDENT EXPORT - Download Filtered Crime Records
+====================================================
+
+Command-line version of the dashboard's export feature. It writes every
+incident matching the chosen filters to a CSV or Parquet file.
+
+Rows are streamed from the database in chunks, so exporting a few hundred
+records or a few million uses the same small amount of memory.
+
+Examples:
+    python scripts/export_incidents.py incidents.csv
+    python scripts/export_incidents.py assaults.parquet --format parquet \\
+        --neighborhood "Downtown Core" --neighborhood "Old Toronto" \\
+        --crime-type Assault --date-range 24months
+
+Parquet output needs the optional pyarrow package (pip install pyarrow).
+"""
+
+import argparse
+import os
+import sys
+
+# Make data_processor importable when running from the scripts/ folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processor import CrimeDataProcessor
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export filtered crime incidents to CSV or Parquet")
+    parser.add_argument('output', help="File to write")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None,
+                        help="Output format (default: taken from the file extension, else csv)")
+    parser.add_argument('--neighborhood', action='append', default=[],
+                        help="District to include; repeat for several (default: all)")
+    parser.add_argument('--crime-type', action='append', default=[],
+                        help="Incident type to include; repeat for several (default: all)")
+    parser.add_argument('--date-range', choices=['3months', '6months', '12months', '24months'],
+                        default='12months', help="Analysis period (default: 12months)")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Rows fetched per chunk")
+    parser.add_argument('--db', default='toronto_crime.db', help="Path to the crime database")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    file_format = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+
+    if not os.path.exists(args.db):
+        sys.exit(f"Database not found: {args.db}. Please run setup_database.py first.")
+
+    processor = CrimeDataProcessor(args.db)
+
+    def show_progress(rows_written, total_rows):
+        percent = rows_written / total_rows * 100 if total_rows else 100
+        print(f"\r   📦 {rows_written:,} / {total_rows:,} rows ({percent:.0f}%)", end='', file=sys.stderr)
+
+    print(f"📥 Exporting incidents to {args.output} ({file_format})...", file=sys.stderr)
+    rows_written = processor.export_filtered_data(
+        args.output,
+        file_format,
+        neighborhood=args.neighborhood,
+        crime_type=args.crime_type,
+        date_range=args.date_range,
+        chunk_size=args.chunk_size,
+        progress_callback=show_progress
+    )
+    print(f"\n✅ Exported {rows_written:,} incidents", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+📡 LIVE INCIDENT INGESTION - Feeding New Dispatches Into the Dashboard
+======================================================================
+
+Runs the append-only ingest service so new incidents show up on the
+dashboard within seconds, without rebuilding the database.
+
+Incidents can arrive two ways:
+- A local TCP socket: send one JSON object per line, e.g.
+    {"incident_date": "2024-06-01", "neighborhood": "York", "crime_type": "Assault",
+     "response_time_minutes": 6.5, "severity": "Medium"}
+- A watched folder: drop .json, .jsonl or .csv files into it; they are
+  moved to a processed/ subfolder once queued, or to failed/ if they can't
+  be read. Write big files under another name (e.g. incidents.json.tmp)
+  and rename them when complete.
+
+Usage:
+    python scripts/ingest_incidents.py --port 8765 --watch incoming/
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Make ingest_service importable when running from the scripts/ folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest_service import IncidentIngestService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append live incidents to the crime database")
+    parser.add_argument('--db', default='toronto_crime.db', help="Database to append to")
+    parser.add_argument('--host', default='127.0.0.1', help="Socket address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Socket port (0 to disable)")
+    parser.add_argument('--watch', help="Folder to watch for incident files")
+    parser.add_argument('--batch-size', type=int, default=500, help="Maximum incidents per write transaction")
+    args = parser.parse_args()
+
+    # Show the service's warnings about failed batches and unreadable files
+    logging.basicConfig(level=logging.INFO, format='   ⚠️ %(message)s')
+
+    service = IncidentIngestService(args.db, batch_size=args.batch_size).start()
+    if args.port:
+        service.serve_socket(args.host, args.port)
+        print(f"📡 Listening for incidents on {args.host}:{args.port}")
+    if args.watch:
+        os.makedirs(args.watch, exist_ok=True)
+        service.watch_directory(args.watch)
+        print(f"📂 Watching {args.watch}/ for incident files")
+
+    try:
+        while True:
+            time.sleep(10)
+            print(f"   ✅ {service.rows_written:,} incidents written "
+                  f"in {service.batches_written:,} batches ({service.rejected:,} rejected, "
+                  f"{service.failed_rows:,} failed, {service.failed_files:,} unreadable files)")
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping - writing any queued incidents...")
+        service.stop()
+        print(f"✅ {service.rows_written:,} incidents written in total")
+
+
+if __name__ == "__main__":
+    main()
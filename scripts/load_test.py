@@ -0,0 +1,447 @@
+"""
+🏋️ LOAD TEST - How Many Concurrent Users Can One Dashboard Serve?
+==================================================================
+
+Starts a real dashboard server (streamlit run --server.headless) and
+connects simulated browsers to it over Streamlit's websocket endpoint, the
+same way a browser tab talks to the server. Every session has its own
+connection and session state and keeps changing filters at random:
+districts, incident types, analysis period, trend granularity, matrix
+metric and incident pages. All sessions run at the same time, so their
+reruns compete for the server's CPU, caches and database exactly like real
+users of one dashboard instance.
+
+Reports rerun latency percentiles (from sending an interaction until the
+rerun finished), throughput, and the server process's CPU time and memory,
+sampled from the operating system while the test runs. Memory per session
+is the growth over an idle server that has already rendered the dashboard
+once. Cache hit rates and timings come from the dashboard's own
+instrumentation (its "⏱️ Performance" panel). Runs use a fixed seed, so two
+runs with the same options replay the same filter changes; save the results
+with --output and compare them with --compare.
+
+Needs the websockets package: pip install websockets
+
+Usage:
+    python scripts/load_test.py --sessions 8 --reruns 25 --incidents 200000
+    python scripts/load_test.py --sessions 8 --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+# Make the setup script importable when running from the scripts/ folder
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts'))
+
+from setup_database import create_database
+
+NEIGHBORHOODS = ['Downtown Core', 'Scarborough', 'North York', 'Etobicoke', 'East York', 'York', 'Old Toronto']
+CRIME_TYPES = ['Auto Theft', 'Drug Offenses', 'Assault', 'Break & Enter', 'Robbery', 'Fraud', 'Vandalism']
+DATE_RANGES = ['Last 3 Months', 'Last 6 Months', 'Last 12 Months', 'Last 24 Months']
+GRANULARITIES = ['Day', 'Week', 'Month', 'Quarter']
+MATRIX_METRICS = ['Incidents', 'Avg Response Time', 'Change vs Previous Period']
+
+WIDGET_TYPES = ('multiselect', 'selectbox', 'radio', 'button', 'checkbox', 'toggle')
+
+# How often the server's memory and CPU time are sampled (seconds)
+SAMPLE_INTERVAL = 0.2
+
+# Headline numbers shown side by side by --compare
+COMPARED_METRICS = [
+    ('latency_ms', 'p50'), ('latency_ms', 'p95'), ('latency_ms', 'p99'),
+    ('throughput', 'reruns_per_second'),
+    ('cpu', 'seconds_per_session'), ('memory', 'mb_per_session'),
+]
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_server(db_path, port, timeout):
+    """Start the dashboard with streamlit run and wait until it answers"""
+    env = dict(os.environ, TORONTO_CRIME_DB=db_path, TORONTO_CRIME_PROFILE='1')
+    # A file rather than a pipe: a full pipe nobody reads would block the server
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', 'app.py',
+         '--server.headless', 'true', '--server.port', str(port),
+         '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=log,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"Dashboard server exited:\n{log.read().decode()}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"Dashboard server didn't answer within {timeout}s")
+
+
+def server_usage(pid):
+    """(resident memory in MB, CPU seconds used so far) of a process"""
+    try:
+        with open(f'/proc/{pid}/status') as handle:
+            rss_kb = next(int(line.split()[1]) for line in handle if line.startswith('VmRSS:'))
+        with open(f'/proc/{pid}/stat') as handle:
+            # Fields after the parenthesized command name; utime and stime are 14 and 15
+            fields = handle.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        return rss_kb / 1024, cpu
+    except FileNotFoundError:
+        # No /proc (e.g. macOS): ask ps, which reports cputime as [[dd-]hh:]mm:ss[.cc]
+        rss_kb, cputime = subprocess.check_output(
+            ['ps', '-o', 'rss=', '-o', 'cputime=', '-p', str(pid)], text=True).split()
+        days, _, clock = cputime.rpartition('-')
+        cpu = sum(float(part) * 60 ** power for power, part in enumerate(reversed(clock.split(':'))))
+        return int(rss_kb) / 1024, cpu + int(days or 0) * 86400
+
+
+async def sample_server(pid, samples, stop):
+    """Record the server's memory until stop is set"""
+    while not stop.is_set():
+        samples.append(server_usage(pid)[0])
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+class BrowserSession:
+    """
+    One simulated browser tab. Like the real frontend, it remembers the
+    value of every widget it has seen and sends all of them with each
+    rerun request.
+    """
+
+    def __init__(self, connection, timeout):
+        self.connection = connection
+        self.timeout = timeout
+        self.values = {}
+        self.widgets = {}
+        self.messages = []
+
+    async def rerun(self, changes=None, click=None):
+        """
+        Set widgets (label -> value), optionally click a button, and wait
+        for the rerun to finish. Returns the script errors it showed.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        for label, value in (changes or {}).items():
+            self.values[self.widgets[label][1].id] = value
+        request = BackMsg()
+        request.rerun_script.query_string = ''
+        request.rerun_script.widget_states.CopyFrom(self.widget_states(click))
+        await self.connection.send(request.SerializeToString())
+        await asyncio.wait_for(self.receive_run(), self.timeout)
+        return [message.delta.new_element.exception.message for message in self.messages
+                if message.WhichOneof('type') == 'delta'
+                and message.delta.new_element.WhichOneof('type') == 'exception']
+
+    async def receive_run(self):
+        """Read messages until the script run (and any st.rerun it triggered) finished"""
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            message = ForwardMsg()
+            message.ParseFromString(await self.connection.recv())
+            kind = message.WhichOneof('type')
+            if kind == 'new_session':
+                # Every run starts with new_session; only the last run's page counts
+                self.messages = []
+            self.messages.append(message)
+            if kind == 'script_finished' and message.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+
+        self.widgets = {}
+        for message in self.messages:
+            if message.WhichOneof('type') != 'delta':
+                continue
+            element = message.delta.new_element
+            kind = element.WhichOneof('type')
+            if kind in WIDGET_TYPES:
+                proto = getattr(element, kind)
+                self.widgets[proto.label] = (kind, proto)
+                if proto.id not in self.values or getattr(proto, 'set_value', False):
+                    self.values[proto.id] = initial_value(kind, proto)
+
+    def widget_states(self, click):
+        """The WidgetStates the frontend would send for the current page"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetStates
+
+        states = WidgetStates()
+        for label, (kind, proto) in self.widgets.items():
+            if kind == 'button' and label != click:
+                continue
+            state = states.widgets.add()
+            state.id = proto.id
+            value = self.values[proto.id]
+            if kind == 'button':
+                state.trigger_value = True
+            elif kind in ('checkbox', 'toggle'):
+                state.bool_value = value
+            elif kind == 'multiselect':
+                # Newer Streamlit versions send option labels, older ones indexes
+                if 'raw_values' in proto.DESCRIPTOR.fields_by_name:
+                    state.string_array_value.data[:] = value
+                else:
+                    state.int_array_value.data[:] = [list(proto.options).index(option) for option in value]
+            elif 'raw_value' in proto.DESCRIPTOR.fields_by_name:
+                state.string_value = value
+            else:
+                state.int_value = list(proto.options).index(value)
+        return states
+
+    def panel(self):
+        """The timings and cache statistics tables of the Performance panel"""
+        from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+        tables = [table.value for table in parse_tree_from_messages(self.messages).dataframe]
+        timings = next(table for table in tables if 'p95_ms' in table.columns)
+        cache_stats = next(table for table in tables if 'hit_rate' in table.columns)
+        return timings, cache_stats
+
+
+def initial_value(kind, proto):
+    """A widget's value as sent by the server (its default, or a value set in session state)"""
+    if kind == 'button':
+        return False
+    if kind in ('checkbox', 'toggle'):
+        return proto.value if proto.set_value else proto.default
+    options = list(proto.options)
+    if kind == 'multiselect':
+        if proto.set_value:
+            return list(proto.raw_values) if 'raw_values' in proto.DESCRIPTOR.fields_by_name \
+                else [options[index] for index in proto.value]
+        return [options[index] for index in proto.default]
+    if proto.set_value:
+        return proto.raw_value if 'raw_value' in proto.DESCRIPTOR.fields_by_name else options[proto.value]
+    return options[proto.default] if options else None
+
+
+def random_action(session, rng):
+    """Pick one random user interaction; returns (name, widget changes, button to click)"""
+    action = rng.choice(['filters', 'filters', 'granularity', 'matrix_metric', 'next_page'])
+    if action == 'filters':
+        return action, {
+            "District/Neighborhood": rng.sample(NEIGHBORHOODS, rng.randint(0, 3)),
+            "Incident Type": rng.sample(CRIME_TYPES, rng.randint(0, 3)),
+            "Analysis Period": rng.choice(DATE_RANGES),
+        }, "🔄 Update Analysis"
+    if action == 'granularity':
+        return action, {"Time Granularity": rng.choice(GRANULARITIES)}, None
+    if action == 'matrix_metric':
+        return action, {"Matrix Metric": rng.choice(MATRIX_METRICS)}, None
+    if session.widgets["Older →"][1].disabled:
+        return random_action(session, rng)
+    return action, {}, "Older →"
+
+
+async def open_session(url, timeout):
+    """Connect a new browser session and load the page once"""
+    import websockets
+
+    connection = await websockets.connect(url, subprotocols=['streamlit'], max_size=None)
+    session = BrowserSession(connection, timeout)
+    errors = await session.rerun()
+    return session, errors
+
+
+async def run_session(url, session_id, seed, reruns, timeout):
+    """One simulated user: an initial page load, then `reruns` random interactions"""
+    rng = random.Random(seed * 1000 + session_id)
+    started = time.perf_counter()
+    session, page_errors = await open_session(url, timeout)
+    latencies = [time.perf_counter() - started]
+    errors = [f"initial_load: {error}" for error in page_errors]
+
+    for _ in range(reruns):
+        action, changes, click = random_action(session, rng)
+        started = time.perf_counter()
+        page_errors = await session.rerun(changes, click)
+        latencies.append(time.perf_counter() - started)
+        errors.extend(f"{action}: {error}" for error in page_errors)
+
+    await session.connection.close()
+    return latencies, errors
+
+
+async def drive_sessions(url, pid, sessions, seed, reruns, timeout):
+    """Run the sessions concurrently while sampling the server's memory"""
+    samples, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(sample_server(pid, samples, stop))
+    try:
+        results = await asyncio.gather(*(
+            run_session(url, session_id, seed, reruns, timeout) for session_id in range(sessions)
+        ))
+    finally:
+        stop.set()
+        await sampler
+    return results, samples
+
+
+async def read_panel(url, timeout):
+    """Load the page in a fresh session and read its Performance panel"""
+    session, _ = await open_session(url, timeout)
+    await session.connection.close()
+    return session.panel()
+
+
+def percentiles_ms(values):
+    values = np.array(values) * 1000
+    return {
+        'mean': round(float(values.mean()), 1),
+        'p50': round(float(np.percentile(values, 50)), 1),
+        'p95': round(float(np.percentile(values, 95)), 1),
+        'p99': round(float(np.percentile(values, 99)), 1),
+        'max': round(float(values.max()), 1),
+    }
+
+
+def run_load_test(db_path, incidents, sessions, reruns, seed, timeout):
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        sys.exit("❌ The load test needs the websockets package: pip install websockets")
+
+    if not os.path.exists(db_path):
+        create_database(db_path, incidents)
+        print()
+
+    port = free_port()
+    url = f'ws://127.0.0.1:{port}/_stcore/stream'
+    print(f"🚀 Starting the dashboard server on port {port}...")
+    server = start_server(db_path, port, timeout)
+    try:
+        # One page load first, so imports, database connections and the
+        # shared caches are warm; what grows after that is per session
+        warm_timings, warm_cache = asyncio.run(read_panel(url, timeout))
+        time.sleep(1)
+        baseline_rss, cpu_started = server_usage(server.pid)
+
+        print(f"🏋️ Running {sessions} concurrent sessions x {reruns} interactions against {db_path}...")
+        started = time.perf_counter()
+        results, rss_samples = asyncio.run(drive_sessions(url, server.pid, sessions, seed, reruns, timeout))
+        elapsed = time.perf_counter() - started
+        peak_rss, cpu_finished = max(rss_samples + [server_usage(server.pid)[0]]), server_usage(server.pid)[1]
+
+        timings, cache_stats = asyncio.run(read_panel(url, timeout))
+    finally:
+        server.terminate()
+        server.wait()
+
+    cpu_used = cpu_finished - cpu_started
+    latencies = [latency for session_latencies, _ in results for latency in session_latencies]
+    errors = [error for _, session_errors in results for error in session_errors]
+    # Only count cache lookups made while the sessions were running
+    lookups = cache_stats[['hits', 'misses']].sub(warm_cache[['hits', 'misses']], fill_value=0)
+
+    return {
+        'config': {
+            'db_path': db_path,
+            'db_size_mb': round(os.path.getsize(db_path) / (1024 * 1024), 1),
+            'sessions': sessions,
+            'reruns_per_session': reruns,
+            'seed': seed,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'latency_ms': percentiles_ms(latencies),
+        'throughput': {
+            'reruns': len(latencies),
+            'elapsed_seconds': round(elapsed, 2),
+            'reruns_per_second': round(len(latencies) / elapsed, 2),
+        },
+        'cpu': {
+            'seconds': round(cpu_used, 2),
+            'seconds_per_session': round(cpu_used / sessions, 2),
+            'ms_per_rerun': round(cpu_used / len(latencies) * 1000, 1),
+            'cores_busy': round(cpu_used / elapsed, 2),
+        },
+        'memory': {
+            'baseline_mb': round(baseline_rss, 1),
+            'peak_mb': round(peak_rss, 1),
+            'mb_per_session': round((peak_rss - baseline_rss) / sessions, 1),
+        },
+        'cache_hit_rates': {
+            name: round(row.hits / (row.hits + row.misses), 3) if row.hits + row.misses else 0.0
+            for name, row in lookups.iterrows()
+        },
+        'timings_ms': {
+            name: {'calls': int(row.calls), 'p50': round(row.p50_ms, 1), 'p95': round(row.p95_ms, 1)}
+            for name, row in timings.iterrows()
+        },
+        'errors': errors,
+    }
+
+
+def print_report(report):
+    latency, throughput, cpu = report['latency_ms'], report['throughput'], report['cpu']
+    print(f"\n📊 Results")
+    print(f"   Reruns:             {throughput['reruns']:,} in {throughput['elapsed_seconds']}s "
+          f"({throughput['reruns_per_second']} per second)")
+    print(f"   Rerun latency:      p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+          f"p99 {latency['p99']} ms, max {latency['max']} ms")
+    print(f"   Server CPU:         {cpu['seconds_per_session']}s per session "
+          f"({cpu['ms_per_rerun']} ms per rerun, {cpu['cores_busy']} cores busy)")
+    print(f"   Memory per session: {report['memory']['mb_per_session']} MB "
+          f"(idle {report['memory']['baseline_mb']} MB, peak {report['memory']['peak_mb']} MB)")
+    for name, hit_rate in report['cache_hit_rates'].items():
+        print(f"   Cache {name + ':':<26} {hit_rate:.0%} hits")
+    if report['errors']:
+        print(f"   ⚠️ Errors:           {len(report['errors'])} (first: {report['errors'][0]})")
+
+
+def print_comparison(report, baseline):
+    print(f"\n🔁 Compared with baseline ({baseline['config']['sessions']} sessions x "
+          f"{baseline['config']['reruns_per_session']} interactions)")
+    for section, metric in COMPARED_METRICS:
+        before, after = baseline[section][metric], report[section][metric]
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"   {section}.{metric + ':':<22} {before:>10} -> {after:<10} ({change})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test a dashboard server with concurrent simulated sessions")
+    parser.add_argument('--db', default='loadtest_crime.db', help="Database to test against (generated if missing)")
+    parser.add_argument('--incidents', type=int, default=200000, help="Incidents to generate for a new database")
+    parser.add_argument('--sessions', type=int, default=4, help="Concurrent simulated sessions")
+    parser.add_argument('--reruns', type=int, default=20, help="Random interactions per session")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the interaction sequence")
+    parser.add_argument('--timeout', type=float, default=120, help="Seconds allowed per rerun")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--compare', help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    report = run_load_test(os.path.abspath(args.db), args.incidents, args.sessions, args.reruns,
+                           args.seed, args.timeout)
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as handle:
+            print_comparison(report, json.load(handle))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\n📁 Results saved as: {args.output}")
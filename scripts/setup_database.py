@@ -8,9 +8,9 @@ the foundation that everything else depends on - our crime database.
 What this script does:
 1. Creates a SQLite database file on your computer
 2. Sets up tables to store crime incidents and neighborhood information
-3. Generates 5,000+ realistic crime records spanning 24 months
-4. Includes seasonal patterns (more crime in summer, less in winter)
-5. Creates neighborhood-specific characteristics (Downtown has different patterns than suburbs)
+3. Generates realistic crime records spanning 24 months (5,000 by default,
+   --incidents for more)
+4. Creates neighborhood-specific characteristics (Downtown has different patterns than suburbs)
 
 Think of this as creating a realistic "practice dataset" that mimics what
 real Toronto crime data might look like. This lets us build and test our
@@ -19,7 +19,7 @@ dashboard without needing access to actual police databases.
 WHY WE NEED THIS:
 - Real crime databases are restricted and not publicly accessible
 - We need realistic data to test our dashboard features
-- Sample data lets us demonstrate seasonal patterns and trends
+- Sample data lets us demonstrate trends and district comparisons
 - It provides a safe environment to learn and experiment
 
 Author: [Your Name]
@@ -30,9 +30,138 @@ import sqlite3  # For creating and managing our SQLite database
 import pandas as pd  # For data manipulation (though we don't use it much here)
 import numpy as np  # For statistical functions and random number generation
 from datetime import datetime, timedelta  # For working with dates
-import random  # For generating random data that feels realistic
+import random  # For picking a seed when none is given
+import argparse  # For reading command-line options
+import os  # For file paths and counting CPU cores
+import shutil  # For cleaning up temporary shard files
+import tempfile  # For a scratch folder next to the database
+import time  # For measuring generation throughput
+from collections import defaultdict  # For per-worker totals
+from concurrent.futures import ProcessPoolExecutor  # For generating shards on every CPU core
 
-def create_database():
+# Toronto districts: name, district code, population, area in km²
+NEIGHBORHOODS = [
+    ('Downtown Core', 'DC', 85000, 15.2),    # Dense urban core
+    ('Scarborough', 'SC', 632000, 187.7),   # Large suburban area
+    ('North York', 'NY', 672000, 176.4),    # Mix of urban and suburban
+    ('Etobicoke', 'ET', 365000, 123.9),     # Western suburbs
+    ('East York', 'EY', 118000, 21.6),      # Smaller central area
+    ('York', 'YK', 154000, 23.2),           # Central-west area
+    ('Old Toronto', 'OT', 365000, 97.2)     # Historic core area
+]
+
+# The types of crimes we'll include in our database
+# These are based on common crime categories in Toronto
+CRIME_TYPES = [
+    'Auto Theft',      # Car theft - a major concern in Toronto
+    'Drug Offenses',   # Drug-related crimes - another priority
+    'Assault',         # Physical attacks
+    'Break & Enter',   # Home/business break-ins
+    'Robbery',         # Theft with force or threat
+    'Fraud',           # Financial crimes
+    'Vandalism'        # Property damage
+]
+
+# Severity levels for incidents
+SEVERITIES = ['Low', 'Medium', 'High']
+
+# Different neighborhoods have different response times and severity mixes:
+# (average response minutes, variation, Low/Medium/High severity weights)
+# Downtown: slower response due to traffic and density, more high-severity incidents
+# Scarborough: moderate response times, mostly medium severity
+# Everywhere else: faster response, mostly low severity
+NEIGHBORHOOD_PROFILES = {
+    'Downtown Core': (9.2, 2.1, [0.2, 0.3, 0.5]),
+    'Scarborough': (7.8, 1.8, [0.3, 0.5, 0.2]),
+}
+DEFAULT_PROFILE = (7.0, 1.5, [0.5, 0.3, 0.2])
+
+# Days of history to generate (24 months)
+HISTORY_DAYS = 730
+
+# Each worker process generates shards of at most this many incidents,
+# building them up in batches that comfortably fit in memory
+SHARD_INCIDENTS = 250_000
+BATCH_INCIDENTS = 100_000
+
+INCIDENT_COLUMNS = 'incident_date, neighborhood, crime_type, response_time_minutes, severity, latitude, longitude'
+
+
+def generate_incidents(rng, count, start_day):
+    """
+    Generate `count` incident records at once with numpy.
+
+    Every column is drawn as a whole array instead of one incident at a
+    time, which is what makes tens of millions of incidents practical.
+    Returns an iterator of row tuples ready for executemany.
+    """
+    names = [n[0] for n in NEIGHBORHOODS]
+    profiles = [NEIGHBORHOOD_PROFILES.get(name, DEFAULT_PROFILE) for name in names]
+    means = np.array([p[0] for p in profiles])
+    spreads = np.array([p[1] for p in profiles])
+    severity_cutoffs = np.cumsum([p[2] for p in profiles], axis=1)
+
+    # A random date within our 24-month window, a random neighborhood and crime type
+    dates = np.datetime64(start_day) + rng.integers(0, HISTORY_DAYS + 1, count)
+    neighborhood = rng.integers(0, len(names), count)
+    crime_type = rng.integers(0, len(CRIME_TYPES), count)
+
+    # Response times follow the neighborhood's profile, with a realistic
+    # minimum of 3 minutes (it takes time to get anywhere!)
+    response_time = np.maximum(3.0, rng.normal(means[neighborhood], spreads[neighborhood])).round(1)
+
+    # Severity drawn from the neighborhood's Low/Medium/High weights
+    draws = rng.random(count)
+    severity = (draws[:, None] >= severity_cutoffs[neighborhood]).sum(axis=1).clip(max=len(SEVERITIES) - 1)
+
+    # GPS coordinates spread around Toronto (roughly 43.6532° N, 79.3832° W),
+    # to 6 decimal places (about 10cm accuracy)
+    lat = (43.6532 + rng.uniform(-0.3, 0.3, count)).round(6)
+    lng = (-79.3832 + rng.uniform(-0.5, 0.5, count)).round(6)
+
+    return zip(
+        np.datetime_as_string(dates, unit='D').tolist(),
+        np.array(names)[neighborhood].tolist(),
+        np.array(CRIME_TYPES)[crime_type].tolist(),
+        response_time.tolist(),
+        np.array(SEVERITIES)[severity].tolist(),
+        lat.tolist(),
+        lng.tolist()
+    )
+
+
+def generate_shard(shard_path, shard_index, num_incidents, seed, start_day):
+    """
+    Worker process: generate one shard of incidents into its own SQLite file.
+
+    The shard's random numbers come from (seed, shard_index) alone, so the
+    same seed always produces the same incidents no matter which worker
+    picks the shard up or how many workers there are.
+    Returns (worker pid, incidents generated, seconds taken).
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng([seed, shard_index])
+
+    conn = sqlite3.connect(shard_path)
+    # Scratch file: no journal, no syncing - if anything fails we start over
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('''
+    CREATE TABLE crime_incidents (
+        incident_date DATE, neighborhood TEXT, crime_type TEXT, response_time_minutes REAL,
+        severity TEXT, latitude REAL, longitude REAL
+    )
+    ''')
+    for offset in range(0, num_incidents, BATCH_INCIDENTS):
+        count = min(BATCH_INCIDENTS, num_incidents - offset)
+        conn.executemany('INSERT INTO crime_incidents VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         generate_incidents(rng, count, start_day))
+    conn.commit()
+    conn.close()
+    return os.getpid(), num_incidents, time.perf_counter() - started
+
+
+def create_database(db_path='toronto_crime.db', num_incidents=5000, workers=None, seed=None):
     """
     This is our main function that builds the entire crime database from scratch.
     
@@ -44,14 +173,22 @@ def create_database():
     
     When this function finishes, we'll have a complete crime database ready
     for our dashboard to use!
+    
+    db_path and num_incidents let benchmarks build bigger databases elsewhere
+    without touching the dashboard's own toronto_crime.db. Incidents are
+    generated in shards by a pool of `workers` processes (default: one per
+    CPU core) and merged into db_path; the same `seed` always gives the same
+    incidents on the same day.
     """
     
     print("🏗️ Starting database creation...")
-    print("This might take a minute - we're generating 5,000+ realistic crime records!")
+    print(f"This might take a minute - we're generating {num_incidents:,} realistic crime records!")
     
     # Connect to our database file (this creates the file if it doesn't exist)
-    conn = sqlite3.connect('toronto_crime.db')
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()  # This is like our "pen" for writing to the database
+    # We're building the whole file from scratch, so skip syncing to disk on every commit
+    cursor.execute('PRAGMA synchronous = OFF')
     
     # =============================================================================
     # 📋 TABLE CREATION - Designing Our Database Structure
@@ -86,9 +223,57 @@ def create_database():
     )
     ''')
     
+    # TABLE 3: Risk Thresholds
+    # Configures how neighborhoods are classified. Each row says "an annualized
+    # rate of at least min_value puts a neighborhood in this tier". Analysts can
+    # tune these without touching any code.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS risk_thresholds (
+        metric TEXT,                            -- 'incidents_per_100k' or 'incidents_per_km2'
+        tier TEXT,                              -- Low / Medium / High
+        min_value REAL,                         -- Lowest annualized rate in this tier
+        PRIMARY KEY (metric, tier)
+    )
+    ''')
+
+    # TABLE 4: Crime Type Priorities
+    # Which incident types get High / Medium / Standard priority
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS crime_type_priorities (
+        crime_type TEXT PRIMARY KEY,            -- Incident type (like "Auto Theft")
+        priority TEXT                           -- High / Medium / Standard Priority
+    )
+    ''')
+
+    # TABLE 5: Daily Rollups
+    # Pre-aggregated incident counts and response time totals per day,
+    # neighborhood and crime type. The live ingest service keeps them in
+    # step with crime_incidents as new incidents arrive.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS daily_rollups (
+        incident_date DATE,                     -- Day of the incidents
+        neighborhood TEXT,                      -- Where they happened
+        crime_type TEXT,                        -- What type of crime
+        incidents INTEGER,                      -- How many incidents
+        response_sum REAL,                      -- Total response minutes
+        response_count INTEGER,                 -- Incidents with a response time
+        PRIMARY KEY (incident_date, neighborhood, crime_type)
+    )
+    ''')
+
     # Clear any existing data (in case we're running this script again)
     cursor.execute('DELETE FROM crime_incidents')
     cursor.execute('DELETE FROM neighborhoods')
+    cursor.execute('DELETE FROM risk_thresholds')
+    cursor.execute('DELETE FROM crime_type_priorities')
+    cursor.execute('DELETE FROM daily_rollups')
+    # AUTOINCREMENT remembers the highest id ever used; forget it so ids start at 1 again
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name IN ('crime_incidents', 'neighborhoods')")
+
+    # Indexes are built once at the end - maintaining them row by row is much slower
+    cursor.execute('DROP INDEX IF EXISTS idx_incidents_date')
+    cursor.execute('DROP INDEX IF EXISTS idx_incidents_filters')
+    cursor.execute('DROP INDEX IF EXISTS idx_incidents_neighborhood_date')
     
     # =============================================================================
     # 🏘️ NEIGHBORHOOD DATA - Information About Toronto Districts
@@ -96,136 +281,138 @@ def create_database():
     
     print("🏘️ Adding Toronto neighborhood data...")
     
-    # Real Toronto neighborhoods with approximate population and area data
-    # This gives our dashboard realistic context for analysis
-    neighborhoods = [
-        ('Downtown Core', 'DC', 85000, 15.2),    # Dense urban core
-        ('Scarborough', 'SC', 632000, 187.7),   # Large suburban area
-        ('North York', 'NY', 672000, 176.4),    # Mix of urban and suburban
-        ('Etobicoke', 'ET', 365000, 123.9),     # Western suburbs
-        ('East York', 'EY', 118000, 21.6),      # Smaller central area
-        ('York', 'YK', 154000, 23.2),           # Central-west area
-        ('Old Toronto', 'OT', 365000, 97.2)     # Historic core area
-    ]
-    
     # Insert all neighborhood data into our database
     cursor.executemany('''
     INSERT INTO neighborhoods (name, district_code, population, area_km2)
     VALUES (?, ?, ?, ?)
-    ''', neighborhoods)
-    
+    ''', NEIGHBORHOODS)
+
+    # =============================================================================
+    # ⚖️ CLASSIFICATION SETTINGS - Risk Thresholds and Priorities
+    # =============================================================================
+
+    print("⚖️ Adding risk classification settings...")
+
+    # Rates are per year, so the same thresholds work for any date range.
+    # Per-100k compares neighborhoods fairly regardless of population;
+    # per-km² highlights dense hot spots.
+    risk_thresholds = [
+        ('incidents_per_100k', 'Low', 0.0),
+        ('incidents_per_100k', 'Medium', 75.0),
+        ('incidents_per_100k', 'High', 250.0),
+        ('incidents_per_km2', 'Low', 0.0),
+        ('incidents_per_km2', 'Medium', 5.0),
+        ('incidents_per_km2', 'High', 15.0),
+    ]
+    cursor.executemany('''
+    INSERT INTO risk_thresholds (metric, tier, min_value)
+    VALUES (?, ?, ?)
+    ''', risk_thresholds)
+
+    crime_type_priorities = [
+        ('Auto Theft', 'High Priority'),
+        ('Drug Offenses', 'High Priority'),
+        ('Break & Enter', 'Medium Priority'),
+        ('Fraud', 'Medium Priority'),
+        ('Assault', 'Medium Priority'),
+        ('Robbery', 'Standard Priority'),
+        ('Vandalism', 'Standard Priority'),
+    ]
+    cursor.executemany('''
+    INSERT INTO crime_type_priorities (crime_type, priority)
+    VALUES (?, ?)
+    ''', crime_type_priorities)
+
     # =============================================================================
     # 🚨 CRIME DATA GENERATION - Creating Realistic Incident Records
     # =============================================================================
     
     print("🚨 Generating realistic crime incident data...")
-    
-    # Define the types of crimes we'll include in our database
-    # These are based on common crime categories in Toronto
-    crime_types = [
-        'Auto Theft',      # Car theft - a major concern in Toronto
-        'Drug Offenses',   # Drug-related crimes - another priority
-        'Assault',         # Physical attacks
-        'Break & Enter',   # Home/business break-ins
-        'Robbery',         # Theft with force or threat
-        'Fraud',           # Financial crimes
-        'Vandalism'        # Property damage
+
+    # Split the row budget into shards and hand them to a pool of worker
+    # processes. Each worker writes its shard to a temporary SQLite file,
+    # which we merge into the database as soon as it is ready.
+    workers = workers or os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    shard_sizes = [min(SHARD_INCIDENTS, num_incidents - offset) for offset in range(0, num_incidents, SHARD_INCIDENTS)]
+    start_day = (datetime.now() - timedelta(days=HISTORY_DAYS)).strftime('%Y-%m-%d')
+    print(f"📊 Generating {len(shard_sizes)} shard(s) with {min(workers, max(len(shard_sizes), 1))} worker(s), seed {seed}...")
+
+    # ATTACH doesn't work inside a transaction, so save the tables first
+    conn.commit()
+
+    shard_dir = tempfile.mkdtemp(prefix='toronto_crime_shards_', dir=os.path.dirname(os.path.abspath(db_path)))
+    jobs = [
+        (os.path.join(shard_dir, f'shard_{index:05d}.db'), index, size, seed, start_day)
+        for index, size in enumerate(shard_sizes)
     ]
-    
-    # Severity levels for incidents
-    severities = ['Low', 'Medium', 'High']
-    
-    # Generate data for the last 24 months (2 years of history)
-    start_date = datetime.now() - timedelta(days=730)
-    incidents = []  # This list will hold all our generated crime records
-    
-    print("📊 Generating incident records (this may take a moment)...")
-    
-    # Generate 5,000 realistic crime incidents
-    for i in range(5000):
-        # Pick a random date within our 24-month window
-        incident_date = start_date + timedelta(days=random.randint(0, 730))
-        
-        # Pick a random neighborhood and crime type
-        neighborhood = random.choice([n[0] for n in neighborhoods])
-        crime_type = random.choice(crime_types)
-        
-        # =============================================================================
-        # 🌡️ SEASONAL PATTERNS - Making Our Data Realistic
-        # =============================================================================
-        
-        # Real crime data shows seasonal patterns, so let's simulate that
-        month = incident_date.month
-        if month in [6, 7, 8]:  # Summer months (June, July, August)
-            crime_multiplier = 1.3  # 30% more crime in summer
-        elif month in [12, 1, 2]:  # Winter months (December, January, February)
-            crime_multiplier = 0.7  # 30% less crime in winter
-        else:  # Spring and fall
-            crime_multiplier = 1.0  # Normal levels
-        
-        # =============================================================================
-        # 🏘️ NEIGHBORHOOD-SPECIFIC PATTERNS - Different Areas, Different Characteristics
-        # =============================================================================
-        
-        # Different neighborhoods have different crime patterns and response times
-        if neighborhood == 'Downtown Core':
-            # Downtown: Higher crime, slower response due to traffic and density
-            response_time = random.normalvariate(9.2, 2.1)  # Average 9.2 minutes, some variation
-            severity_weights = [0.2, 0.3, 0.5]  # More high-severity incidents (50% high, 30% medium, 20% low)
-        elif neighborhood == 'Scarborough':
-            # Scarborough: Moderate crime, moderate response times
-            response_time = random.normalvariate(7.8, 1.8)  # Average 7.8 minutes
-            severity_weights = [0.3, 0.5, 0.2]  # Mostly medium severity
+    worker_totals = defaultdict(lambda: [0, 0, 0.0])  # shards, incidents, seconds
+    executor = None
+    started = time.perf_counter()
+    try:
+        if workers == 1 or len(jobs) <= 1:
+            # Not worth starting processes for a single shard
+            results = (generate_shard(*job) for job in jobs)
         else:
-            # Other neighborhoods: Lower crime, faster response
-            response_time = random.normalvariate(7.0, 1.5)  # Average 7.0 minutes
-            severity_weights = [0.5, 0.3, 0.2]  # Mostly low severity
-        
-        # Make sure response time is realistic (minimum 3 minutes - it takes time to get anywhere!)
-        response_time = max(3.0, response_time)
-        
-        # Choose severity based on neighborhood characteristics
-        severity = np.random.choice(severities, p=severity_weights)
-        
-        # =============================================================================
-        # 📍 GEOGRAPHIC COORDINATES - Placing Incidents on the Map
-        # =============================================================================
-        
-        # Generate realistic GPS coordinates for Toronto
-        # Toronto is roughly centered at 43.6532° N, 79.3832° W
-        # We'll add some random variation to spread incidents around the city
-        lat = 43.6532 + random.uniform(-0.3, 0.3)  # Latitude (north-south)
-        lng = -79.3832 + random.uniform(-0.5, 0.5)  # Longitude (east-west)
-        
-        # Create a record for this incident
-        incidents.append((
-            incident_date.strftime('%Y-%m-%d'),  # Format date as YYYY-MM-DD
-            neighborhood,
-            crime_type,
-            round(response_time, 1),  # Round to 1 decimal place
-            severity,
-            round(lat, 6),  # GPS coordinates to 6 decimal places (about 10cm accuracy)
-            round(lng, 6)
-        ))
-        
-        # Show progress every 1000 incidents so user knows we're working
-        if (i + 1) % 1000 == 0:
-            print(f"   ✅ Generated {i + 1} incidents...")
-    
-    # =============================================================================
-    # 💾 SAVING DATA TO DATABASE - Writing All Our Records
-    # =============================================================================
-    
-    print("💾 Saving all incident records to database...")
-    
-    # Insert all our generated incidents into the database
-    # This is like filing thousands of crime reports in our digital filing cabinet
-    cursor.executemany('''
-    INSERT INTO crime_incidents 
-    (incident_date, neighborhood, crime_type, response_time_minutes, severity, latitude, longitude)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', incidents)
-    
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+            results = executor.map(generate_shard, *zip(*jobs))
+
+        # Results come back in shard order, so incident ids are reproducible too
+        for (shard_path, index, *_), (pid, count, seconds) in zip(jobs, results):
+            totals = worker_totals[pid]
+            totals[0] += 1
+            totals[1] += count
+            totals[2] += seconds
+            print(f"   ✅ Shard {index + 1}/{len(jobs)}: {count:,} incidents from worker {pid} "
+                  f"({count / max(seconds, 1e-9):,.0f} incidents/s)")
+
+            # 💾 Copy the shard's records into our database in one statement
+            cursor.execute('ATTACH DATABASE ? AS shard', (shard_path,))
+            cursor.execute(f'''
+            INSERT INTO crime_incidents ({INCIDENT_COLUMNS})
+            SELECT {INCIDENT_COLUMNS} FROM shard.crime_incidents ORDER BY rowid
+            ''')
+            conn.commit()
+            cursor.execute('DETACH DATABASE shard')
+            os.remove(shard_path)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    for pid, (shards, count, seconds) in sorted(worker_totals.items()):
+        print(f"   👷 Worker {pid}: {shards} shard(s), {count:,} incidents, "
+              f"{count / max(seconds, 1e-9):,.0f} incidents/s")
+    print(f"   ⚡ {num_incidents:,} incidents generated and merged in {elapsed:.1f}s "
+          f"({num_incidents / max(elapsed, 1e-9):,.0f} incidents/s overall)")
+
+    # Indexes let the dashboard filters (date window plus IN-lists of
+    # neighborhoods and crime types) seek straight to matching rows
+    print("🗂️ Building indexes...")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_incidents_date ON crime_incidents (incident_date)')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_incidents_filters
+    ON crime_incidents (neighborhood, crime_type, incident_date)
+    ''')
+    # Newest-first incident pages for a district read this index in order
+    # (the id comes last in every index), so no page has to sort the district
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_incidents_neighborhood_date
+    ON crime_incidents (neighborhood, incident_date)
+    ''')
+
+    # Summarize every day/neighborhood/crime type combination for fast charts
+    print("🧮 Building daily rollups...")
+    cursor.execute('''
+    INSERT INTO daily_rollups
+    SELECT incident_date, neighborhood, crime_type,
+           COUNT(*), COALESCE(SUM(response_time_minutes), 0), COUNT(response_time_minutes)
+    FROM crime_incidents
+    GROUP BY incident_date, neighborhood, crime_type
+    ''')
+
     # Save all changes to the database file
     conn.commit()
     conn.close()
@@ -235,8 +422,8 @@ def create_database():
     # =============================================================================
     
     print("\n🎉 Database created successfully!")
-    print(f"📊 Total incidents generated: {len(incidents):,}")
-    print("📁 Database saved as: toronto_crime.db")
+    print(f"📊 Total incidents generated: {num_incidents:,}")
+    print(f"📁 Database saved as: {db_path}")
     print("\n✅ Your dashboard is now ready to use!")
     print("   Run 'streamlit run app.py' to start the dashboard")
 
@@ -253,4 +440,10 @@ if __name__ == "__main__":
     This is a common Python pattern for scripts that can be both
     imported as modules and run as standalone programs.
     """
-    create_database()
+    parser = argparse.ArgumentParser(description="Create the sample Toronto crime database")
+    parser.add_argument('--db', default='toronto_crime.db', help="Database file to create")
+    parser.add_argument('--incidents', type=int, default=5000, help="Number of incidents to generate")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU core)")
+    parser.add_argument('--seed', type=int, help="Seed for reproducible data (default: random)")
+    args = parser.parse_args()
+    create_database(args.db, args.incidents, args.workers, args.seed)
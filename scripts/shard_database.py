@@ -0,0 +1,153 @@
+"""
+🗃️ DATABASE SHARDING - Splitting History Into Per-Period Files
+==============================================================
+
+As history grows, a single toronto_crime.db file becomes slow to write to
+and to VACUUM. This script splits the crime_incidents table into one SQLite
+file per year (or per quarter), so old periods never need to be touched
+again and queries only open the files that overlap their date window.
+
+Layout of the shard directory:
+    catalog.db          neighborhoods + config tables, shard_ranges listing
+                        each shard's date range, and empty crime_incidents
+                        and daily_rollups tables
+    crime_2024.db       incidents and daily rollups from 2024 (or crime_2024Q1.db, ...)
+    crime_2025.db       ...
+
+Incident ids are preserved, so results match the single-file database.
+
+Usage:
+    python scripts/shard_database.py                        # per year into shards/
+    python scripts/shard_database.py --by quarter --shard-dir shards_q
+
+Then point the dashboard at it:
+    TORONTO_CRIME_SHARDS=shards streamlit run app.py
+"""
+
+import argparse
+import os
+import sqlite3
+
+# Tables copied into the catalog alongside the shard list
+CATALOG_TABLES = ['neighborhoods', 'risk_thresholds', 'crime_type_priorities']
+
+
+def period_of(date_string, by):
+    """Shard label for a YYYY-MM-DD date: '2024' or '2024Q1'"""
+    year, month = date_string[:4], int(date_string[5:7])
+    if by == 'quarter':
+        return f"{year}Q{(month - 1) // 3 + 1}"
+    return year
+
+
+def period_bounds(period):
+    """First and last date (inclusive) covered by a shard label"""
+    if 'Q' in period:
+        year, quarter = period.split('Q')
+        first_month = (int(quarter) - 1) * 3 + 1
+        last_month = first_month + 2
+        last_day = '31' if last_month in (3, 12) else '30'
+        return f"{year}-{first_month:02d}-01", f"{year}-{last_month:02d}-{last_day}"
+    return f"{period}-01-01", f"{period}-12-31"
+
+
+def table_sql(conn, table_name):
+    """CREATE TABLE statement for a table in the source database, or None"""
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def shard_database(source='toronto_crime.db', shard_dir='shards', by='year'):
+    """Split source into per-period shard files plus a catalog in shard_dir"""
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Database not found: {source}. Please run setup_database.py first.")
+    os.makedirs(shard_dir, exist_ok=True)
+
+    source_conn = sqlite3.connect(source)
+    incidents_sql = table_sql(source_conn, 'crime_incidents')
+    rollups_sql = table_sql(source_conn, 'daily_rollups')
+
+    dates = source_conn.execute(
+        "SELECT DISTINCT substr(incident_date, 1, 10) FROM crime_incidents ORDER BY 1"
+    ).fetchall()
+    periods = sorted({period_of(date, by) for (date,) in dates})
+    print(f"🗃️ Splitting {source} into {len(periods)} {by} shards in {shard_dir}/")
+
+    shard_ranges = []
+    for period in periods:
+        start_date, end_date = period_bounds(period)
+        file_name = f"crime_{period}.db"
+        shard_path = os.path.join(shard_dir, file_name)
+        if os.path.exists(shard_path):
+            os.remove(shard_path)
+
+        # ATTACH the new shard and copy its rows over in one statement
+        source_conn.execute("ATTACH DATABASE ? AS shard", (shard_path,))
+        source_conn.execute(incidents_sql.replace('crime_incidents', 'shard.crime_incidents', 1))
+        source_conn.execute("""
+        INSERT INTO shard.crime_incidents
+        SELECT * FROM main.crime_incidents
+        WHERE incident_date >= ? AND incident_date <= ?
+        """, (start_date, end_date + ' 23:59:59'))
+        source_conn.execute('CREATE INDEX shard.idx_incidents_date ON crime_incidents (incident_date)')
+        source_conn.execute('''
+        CREATE INDEX shard.idx_incidents_filters
+        ON crime_incidents (neighborhood, crime_type, incident_date)
+        ''')
+        source_conn.execute('''
+        CREATE INDEX shard.idx_incidents_neighborhood_date
+        ON crime_incidents (neighborhood, incident_date)
+        ''')
+        # Daily rollups are partitioned the same way as the incidents
+        if rollups_sql:
+            source_conn.execute(rollups_sql.replace('daily_rollups', 'shard.daily_rollups', 1))
+            source_conn.execute("""
+            INSERT INTO shard.daily_rollups
+            SELECT * FROM main.daily_rollups
+            WHERE incident_date >= ? AND incident_date <= ?
+            """, (start_date, end_date + ' 23:59:59'))
+        rows = source_conn.execute("SELECT COUNT(*) FROM shard.crime_incidents").fetchone()[0]
+        source_conn.commit()
+        source_conn.execute("DETACH DATABASE shard")
+
+        shard_ranges.append((file_name, start_date, end_date))
+        print(f"   ✅ {file_name}: {rows:,} incidents")
+
+    # The catalog holds everything that isn't partitioned by date
+    catalog_path = os.path.join(shard_dir, 'catalog.db')
+    if os.path.exists(catalog_path):
+        os.remove(catalog_path)
+    source_conn.execute("ATTACH DATABASE ? AS catalog", (catalog_path,))
+    source_conn.execute(incidents_sql.replace('crime_incidents', 'catalog.crime_incidents', 1))
+    if rollups_sql:
+        source_conn.execute(rollups_sql.replace('daily_rollups', 'catalog.daily_rollups', 1))
+    for table_name in CATALOG_TABLES:
+        create_sql = table_sql(source_conn, table_name)
+        if create_sql is None:
+            continue
+        source_conn.execute(create_sql.replace(table_name, f'catalog.{table_name}', 1))
+        source_conn.execute(f"INSERT INTO catalog.{table_name} SELECT * FROM main.{table_name}")
+    source_conn.execute('''
+    CREATE TABLE catalog.shard_ranges (
+        file_name TEXT PRIMARY KEY,             -- Shard file inside the shard directory
+        start_date DATE,                        -- First day stored in the shard
+        end_date DATE                           -- Last day stored in the shard
+    )
+    ''')
+    source_conn.executemany("INSERT INTO catalog.shard_ranges VALUES (?, ?, ?)", shard_ranges)
+    source_conn.commit()
+    source_conn.execute("DETACH DATABASE catalog")
+    source_conn.close()
+
+    print(f"📁 Catalog saved as: {catalog_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split toronto_crime.db into per-year or per-quarter shards")
+    parser.add_argument('--source', default='toronto_crime.db', help="Single-file database to split")
+    parser.add_argument('--shard-dir', default='shards', help="Directory for the shard files")
+    parser.add_argument('--by', choices=['year', 'quarter'], default='year', help="Shard period")
+    args = parser.parse_args()
+    shard_database(args.source, args.shard_dir, args.by)